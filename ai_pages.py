@@ -0,0 +1,158 @@
+import time
+import columnar_store
+import query_plan
+import timeseries
+import tracing
+from gemini_scheduler import PRIORITY_INTERACTIVE, PRIORITY_BATCH, make_coalesce_key
+
+# Server-side work of the AI pages (AutoViz, FutureCast, InsightGen and
+# SmartQuery): scratch store writes, columnar reads, prompt building, the
+# Gemini calls through the shared scheduler and the file upload lifecycle.
+# app.py renders the widgets and results around these methods and the load
+# test calls the same methods, so both always run the same code. Nothing in
+# here may call st.*; errors are raised (ValueError, QuotaExceeded) and the
+# caller decides how to show them.
+
+# What a bad or unanswerable query plan raises; SmartQuery falls back to sending the dataset
+PLAN_ERRORS = (ValueError, TypeError, KeyError, AttributeError)
+
+
+class AIPages:
+    def __init__(self, genai, model, config, scheduler, scratch, store_dir=None, poll_seconds=10):
+        self.genai = genai
+        self.model = model
+        self.config = config
+        self.scheduler = scheduler
+        self.scratch = scratch
+        self.store_dir = store_dir
+        self.poll_seconds = poll_seconds
+
+    # Reads that app.py overrides with st.cache_data versions
+    def read_columns(self, path, columns=None):
+        return columnar_store.read_columns(path, columns)
+
+    def extract_dataset_data(self, path, name):
+        return columnar_store.extract_dataset_data(path, name)
+
+    def table_schema(self, path):
+        return query_plan.table_schema(path)
+
+    # Canonical columnar file of an upload (parsed once per content)
+    def dataset_path(self, upload, sheet_name=None):
+        path = columnar_store.ingest(upload.name, upload.getvalue(), store_dir=self.store_dir, sheet_name=sheet_name)
+        if upload.name.lower().endswith('.xlsx'):
+            # The other sheets are converted in the background, so switching sheets later is instant
+            columnar_store.ingest_workbook_background(upload.getvalue(), store_dir=self.store_dir)
+        return path
+
+    @tracing.traced("gemini.upload_file")
+    def upload_to_gemini(self, path, mime_type=None, display_name=None):
+        file = self.genai.upload_file(path, mime_type=mime_type, display_name=display_name)
+        print(f"Uploaded file '{file.display_name}' as: {file.uri}")
+        return file
+
+    @tracing.traced("gemini.wait_for_files_active")
+    def wait_for_files_active(self, files):
+        for name in (file.name for file in files):
+            file = self.genai.get_file(name)
+            while file.state.name == "PROCESSING":
+                print(".", end="", flush=True)
+                time.sleep(self.poll_seconds)
+                file = self.genai.get_file(name)
+            if file.state.name != "ACTIVE":
+                raise Exception(f"File {file.name} failed to process")
+
+    # Store the upload, send it to Gemini and return the dataset rows as chat history parts
+    def _upload_dataset(self, upload, path):
+        file_path = self.scratch.put_upload(upload)
+        files = [self.upload_to_gemini(file_path, mime_type="text/csv", display_name=upload.name)]
+        self.wait_for_files_active(files)
+        return self.extract_dataset_data(path, upload.name)
+
+    # AutoViz: plotting code for the upload, with the stored file's path filled in
+    def autoviz_code(self, upload, visualization_type, columns, api_key, sheet_name=None):
+        file_path = self.scratch.put_upload(upload)
+        # Only the first rows are read for the sample
+        df_sample = str(columnar_store.head(self.dataset_path(upload, sheet_name), 5))
+        prompt = f"""Write a python code to plot a {visualization_type} using Matplotlib or Seaborn Library. Name of the dataset is {upload.name}.
+            Plot for the dataset columns {columns}. Here's the sample of dataset {df_sample}. Set xticks rotation 90 degree.
+            Set title in each plot. Add tight layout in necessary plots. Don't right the explanation, just write the code."""
+        with tracing.span("gemini.generate_content"):
+            response = self.scheduler.call(self.model.generate_content, prompt, generation_config=self.config,
+                                           key=api_key, priority=PRIORITY_INTERACTIVE)
+        code = response.text.replace("```python", "").replace("```", "").strip()
+        # Insert the actual file path into pd.read_csv() / pd.read_excel()
+        if "pd.read_csv" in code:
+            code = code.replace("pd.read_csv()", f'pd.read_csv(r"{file_path}")')
+        elif "pd.read_excel" in code:
+            sheet_argument = f", sheet_name={sheet_name!r}" if sheet_name is not None else ""
+            code = code.replace("pd.read_excel()", f'pd.read_excel(r"{file_path}"{sheet_argument})')
+        return code
+
+    # FutureCast: present or future insight; time series are sent as compact aggregates instead of every raw row
+    def futurecast(self, upload, type_of_recommendation, api_key):
+        path = self.dataset_path(upload)
+        columns = columnar_store.time_series_columns(path)
+        ts = None
+        if columns is not None:
+            # Only the datetime and numeric columns are read
+            ts = timeseries.to_time_index(self.read_columns(path, columns), columns[0])
+        if ts is not None and len(ts) >= 2:
+            history_parts = [timeseries.summary_text(timeseries.summarize(ts), upload.name)]
+        else:
+            history_parts = self._upload_dataset(upload, path)
+        chat_session = self.model.start_chat(history=[{"role": "user", "parts": history_parts}])
+        question = f""""Provide {type_of_recommendation} based on the dataset {upload.name}. If dataset is related to financial or healthcare
+                , just give your best recommendation, don't think about advisor or expertise thing. Mention also
+                that recommendation is generated by AI, first give your essential recommendations. So, the user take the final decision on
+                their own. Warn user about AI recommendation but, do your work."""
+        with tracing.span("gemini.send_message"):
+            response = self.scheduler.call(chat_session.send_message, question, key=api_key, priority=PRIORITY_INTERACTIVE,
+                                           coalesce_key=make_coalesce_key("ai_recommendation", upload.getvalue(), question))
+        return response.text
+
+    # InsightGen: text report from the summary of the numeric columns (all columns when there are none)
+    def report_text(self, upload, api_key, sheet_name=None):
+        path = self.dataset_path(upload, sheet_name)
+        summary = self.read_columns(path, columnar_store.numeric_columns(path) or None).describe().transpose().to_string()
+        prompt = f"""Generate a text report for {upload.name} dataset using Gemini AI. Here's the summary of the dataset: {summary}.
+                            Try to make the report in bullet points and use numbers for better readability and understanding."""
+        with tracing.span("gemini.generate_content"):
+            response = self.scheduler.call(self.model.generate_content, prompt, generation_config=self.config,
+                                           key=api_key, priority=PRIORITY_BATCH,
+                                           coalesce_key=make_coalesce_key("analysis_report", prompt))
+        return response.text
+
+    # SmartQuery: answer from a locally executed query plan (only the schema and the result reach Gemini),
+    # falling back to sending the dataset. Returns the answer with the plan and result, or why the plan was not used.
+    def smartquery(self, upload, question, api_key, local=True):
+        path = self.dataset_path(upload)
+        reply = {"answer": None, "plan": None, "result": None, "local_error": None}
+        if local:
+            prompt = query_plan.build_plan_prompt(self.table_schema(path), columnar_store.num_rows(path), question, upload.name)
+            with tracing.span("gemini.query_plan"):
+                response = self.scheduler.call(self.model.generate_content, prompt, key=api_key, priority=PRIORITY_INTERACTIVE,
+                                               generation_config={"temperature": 0, "response_mime_type": "application/json"},
+                                               coalesce_key=make_coalesce_key("smartquery_plan", prompt))
+            try:
+                plan = query_plan.parse_plan(response.text)
+                # Only the columns the plan reads are loaded
+                df = query_plan.plan_frame(path, plan)
+                plan = query_plan.validate_plan(plan, df)
+                if plan["answerable"]:
+                    with tracing.span("smartquery.execute_plan"):
+                        reply.update(plan=plan, result=query_plan.execute_plan(plan, df))
+            except PLAN_ERRORS as e:
+                reply["local_error"] = str(e)
+        if reply["plan"] is not None:
+            prompt = query_plan.build_answer_prompt(question, reply["plan"], reply["result"], upload.name)
+            with tracing.span("gemini.generate_content"):
+                response = self.scheduler.call(self.model.generate_content, prompt, generation_config=self.config, key=api_key,
+                                               priority=PRIORITY_INTERACTIVE, coalesce_key=make_coalesce_key("smartquery_answer", prompt))
+        else:
+            chat_session = self.model.start_chat(history=[{"role": "user", "parts": self._upload_dataset(upload, path)}])
+            with tracing.span("gemini.send_message"):
+                response = self.scheduler.call(chat_session.send_message, question, key=api_key, priority=PRIORITY_INTERACTIVE,
+                                               coalesce_key=make_coalesce_key("ai_data_file_chatbot", upload.getvalue(), question))
+        reply["answer"] = response.text
+        return reply
@@ -1,6 +1,5 @@
 import os
 import time
-import csv
 import yaml
 import json
 from PIL import Image
@@ -15,10 +14,23 @@ import streamlit_authenticator as stauth
 from streamlit_authenticator.utilities import LoginError
 from streamlit_authenticator.utilities.hasher import Hasher
 from streamlit_gsheets import GSheetsConnection
-from ydata_profiling import ProfileReport
-import google.generativeai as genai
+# AURORA_FAKE_GEMINI=1 swaps in the local stand-in (no quota or network, see fake_genai.py)
+if os.getenv("AURORA_FAKE_GEMINI", "0").lower() in ("1", "true", "yes"):
+    import fake_genai as genai
+else:
+    import google.generativeai as genai
 from dotenv import load_dotenv
-from sklearn.impute import SimpleImputer
+import data_pipeline
+import columnar_store
+import excel_ingest
+from scratch_store import ScratchStore
+import tracing
+import correlation
+import preview
+import query_plan
+import ai_pages
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from gemini_scheduler import GeminiScheduler, PRIORITY_INTERACTIVE
 
 # Streamlit page configuration
 st.set_page_config(
@@ -28,13 +40,18 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Attribute traced spans of this script run to the current session; spans before navigation count as "startup"
+script_run_ctx = get_script_run_ctx()
+tracing.set_context(page="startup", session=script_run_ctx.session_id if script_run_ctx else "")
+
 ###################################################### Google Sheets Connection #######################################
 # Establish a connection to Google Sheets
 conn = st.connection("gsheets", type=GSheetsConnection)
 # Read the data from Google Sheets
-feedback_df = conn.read(worksheet="Feedback", ttl=60)
-query_df = conn.read(worksheet="Query", ttl=60)
-user_df = conn.read(worksheet="UserLogin", ttl=60)
+with tracing.span("sheets.read"):
+    feedback_df = conn.read(worksheet="Feedback", ttl=60)
+    query_df = conn.read(worksheet="Query", ttl=60)
+    user_df = conn.read(worksheet="UserLogin", ttl=60)
 
 ###################################################### User Authentication ######################################################
 
@@ -116,7 +133,8 @@ def show_register_form():
             updated_df = pd.concat([user_df, user_data], ignore_index=True)
 
             # Update Google Sheets with new User Data
-            conn.update(worksheet="UserLogin", data=updated_df)
+            with tracing.span("sheets.update"):
+                conn.update(worksheet="UserLogin", data=updated_df)
             st.success("User registered successfully! You can now log in.")
             st.session_state['register'] = False  # Go back to login page
         else:
@@ -157,48 +175,99 @@ config_for_chatbot = {
 }
 model_for_chatbot = genai.GenerativeModel(model_name='gemini-1.5-flash',generation_config=config_for_chatbot)
 
+# Shared Gemini scheduler (one per server process, shared by all sessions)
+@st.cache_resource
+def get_gemini_scheduler():
+    return GeminiScheduler(per_key_rpm=15, global_rpm=60, max_concurrency=4)
+
+scheduler = get_gemini_scheduler()
+
+# Metrics exporters (AURORA_METRICS_FILE / AURORA_METRICS_PORT), started once per server process
+@st.cache_resource
+def start_metrics_exporters():
+    tracing.registry.add_collector(scheduler.metrics)
+    return tracing.start_exporters()
+
+start_metrics_exporters()
+
+# Content-addressed scratch store for uploaded files, shared by all sessions
+@st.cache_resource
+def get_scratch_store():
+    store = ScratchStore()
+    store.start_eviction()
+    return store
+
+scratch = get_scratch_store()
+
 
 
 ###################################################### Functions ######################################################
-# Function for loading csv format file
-@st.cache_data
-def load_csv_format(file):
-        df = pd.read_csv(file)
-        return df
-    
-# Function for loading xlsx format file
-@st.cache_data
-def load_xlsx_format(file):
-        df = pd.read_excel(file)
-        return df
+# Function for converting an upload into its canonical columnar file (parsed once per content)
+def dataset_path(uploaded_file, sheet_name=None):
+    return pages.dataset_path(uploaded_file, sheet_name)
 
 # Function for loading file based on its format
 @st.cache_data
-def load_file(uploaded_file):
-    if uploaded_file.name.endswith('.csv'):
-            return load_csv_format(uploaded_file)
-    elif uploaded_file.name.endswith('.xlsx'):
-            return load_xlsx_format(uploaded_file)
-    else:
-        st.error("Unsupported file format. Please upload a CSV or XLSX file.")
+def load_file(uploaded_file, columns=None, sheet_name=None):
+    try:
+        return columnar_store.read_columns(dataset_path(uploaded_file, sheet_name), columns)
+    except ValueError as e:
+        st.error(e)
 
+# Function for reading workbook sheet names and sizes (no cells are parsed)
 @st.cache_data
-# Function for data cleaning
-def df_cleaning(df):
-    df = df.drop_duplicates()
+def xlsx_sheet_metadata(uploaded_file):
+    return excel_ingest.sheet_metadata(uploaded_file.getvalue())
 
-    # Impute missing values
-    # Seperate numerical and object columns
-    numerical_columns = df.select_dtypes(include=['int64', 'float64']).columns
-    object_columns = df.select_dtypes(include=['object']).columns
+# Function for picking a sheet of an uploaded workbook (None for CSV files)
+def select_sheet(uploaded_file, key):
+    if not uploaded_file.name.lower().endswith('.xlsx'):
+        return None
+    try:
+        sheets = [sheet for sheet in xlsx_sheet_metadata(uploaded_file) if not sheet["hidden"]]
+    except ValueError as e:
+        st.error(e)
+        st.stop()
+    if len(sheets) <= 1:
+        return sheets[0]["name"] if sheets else None
+    labels = {sheet["name"]: f"{sheet['name']} ({sheet['rows'] or '?'} rows x {sheet['columns'] or '?'} columns)" for sheet in sheets}
+    return st.selectbox("Select a sheet", list(labels), format_func=labels.get, key=key)
 
-    # Impute missing values for numerical columns and object columns
-    numerical_imputer = SimpleImputer(strategy='mean')
-    df[numerical_columns] = numerical_imputer.fit_transform(df[numerical_columns])
+@st.cache_data
+# Function for data cleaning
+def df_cleaning(df):
+    return data_pipeline.df_cleaning(df)
 
-    object_imputer = SimpleImputer(strategy='most_frequent')
-    df[object_columns] = object_imputer.fit_transform(df[object_columns])
-    return df
+# Function for the CleanStats statistics
+@st.cache_data
+def clean_stats(df, correlation_method="pearson", top_k=50):
+    return data_pipeline.clean_stats(df, correlation_method, top_k)
+
+# Function for showing a paginated preview (only the visible window is sent to the browser).
+# As a fragment, paging, sorting and filtering rerun only this function, not the whole page.
+@st.fragment
+def show_dataset_preview(path, key):
+    column_names = columnar_store.schema(path).names
+    with st.expander("Preview options"):
+        col1, col2 = st.columns(2)
+        columns = col1.multiselect("Columns", column_names, default=column_names[:preview.MAX_COLUMNS],
+                                   max_selections=preview.MAX_COLUMNS, key=f'{key}_columns')
+        page_size = col2.selectbox("Rows per page", preview.PAGE_SIZES, index=2, key=f'{key}_page_size')
+        sort_by = col1.selectbox("Sort by", [None] + column_names, format_func=lambda c: "(none)" if c is None else c, key=f'{key}_sort_by')
+        ascending = col2.toggle("Ascending", value=True, key=f'{key}_ascending')
+        filter_column = col1.selectbox("Filter column", [None] + column_names, format_func=lambda c: "(none)" if c is None else c, key=f'{key}_filter_column')
+        filter_text = col2.text_input("Contains", key=f'{key}_filter_text')
+    filter_key = (page_size, sort_by, ascending, filter_column, filter_text)
+    if st.session_state.get(f'{key}_filter_key') != filter_key:
+        # A new sort or filter starts again on the first page
+        st.session_state[f'{key}_filter_key'] = filter_key
+        st.session_state[f'{key}_page'] = 1
+    total_pages = preview.page_count(path, page_size=page_size, filter_column=filter_column, filter_text=filter_text)
+    page = st.number_input("Page", min_value=1, max_value=total_pages, step=1, key=f'{key}_page')
+    window = preview.preview_window(path, page=page, page_size=page_size, columns=columns or None, sort_by=sort_by,
+                                    ascending=ascending, filter_column=filter_column, filter_text=filter_text)
+    st.dataframe(window["data"], use_container_width=True)
+    st.caption(f"Rows {window['first_row']}-{window['last_row']} of {window['total_rows']} (page {window['page']} of {window['total_pages']})")
 
 # Function for lottie file
 def load_lottie_file(filepath: str):
@@ -208,41 +277,37 @@ def load_lottie_file(filepath: str):
 # Function for generating report
 @st.cache_data
 def generate_report(df,file):
-    # Generate profiling report
-    profile = ProfileReport(df, title="Dataset Report", explorative=True)
-
-    # Save the report as an HTML file
-    output_path = os.path.join("reports", f"{file.name.split('.')[0]}_report.html")
-    profile.to_file(output_path)
-    return output_path
-
-# Function for uploading file to Gemini
-# @st.cache_data
-def upload_to_gemini(path, mime_type=None):
-    file = genai.upload_file(path, mime_type=mime_type)
-    print(f"Uploaded file '{file.display_name}' as: {file.uri}")
-    return file
-
-def wait_for_files_active(files):
-    for name in (file.name for file in files):
-        file = genai.get_file(name)
-        while file.state.name == "PROCESSING":
-            print(".", end="", flush=True)
-            time.sleep(10)
-            file = genai.get_file(name)
-            if file.state.name != "ACTIVE":
-                raise Exception(f"File {file.name} failed to process")
-
-# Function for extracting csv data
+    return data_pipeline.generate_report(df, file.name)
+
+FILE_POLL_SECONDS = float(os.getenv("AURORA_FILE_POLL_SECONDS", "10"))
+
+# Function for reading a few columns of a dataset
+@st.cache_data
+def read_columns(path, columns=None):
+    return columnar_store.read_columns(path, columns)
+
+# Function for extracting dataset rows as prompt parts
+@st.cache_data
+def extract_dataset_data(path: str, name: str) -> list[str]:
+    return columnar_store.extract_dataset_data(path, name)
+
+# Function for the schema text SmartQuery sends instead of the data
 @st.cache_data
-def extract_csv_data(pathname: str) -> list[str]:
-  parts = [f"---START OF CSV ${pathname} ---"]
-  with open(pathname, "r", newline="") as csvfile:
-    reader = csv.reader(csvfile)
-    for row in reader:
-      str=" "
-      parts.append(str.join(row))
-  return parts
+def query_schema(path):
+    return query_plan.table_schema(path)
+
+# Server-side work of the AI pages, shared with the load test; reads go through the cached functions above
+class StreamlitPages(ai_pages.AIPages):
+    def read_columns(self, path, columns=None):
+        return read_columns(path, columns)
+
+    def extract_dataset_data(self, path, name):
+        return extract_dataset_data(path, name)
+
+    def table_schema(self, path):
+        return query_schema(path)
+
+pages = StreamlitPages(genai, model, config, scheduler, scratch, poll_seconds=FILE_POLL_SECONDS)
 
 ###################################################### Page 1: Introduction Page ######################################################
 def introduction():
@@ -371,7 +436,8 @@ def statistical_analysis():
 
     if uploaded_file is not None:
     # Load the file based on its format
-        df = load_file(uploaded_file)
+        sheet_name = select_sheet(uploaded_file, key='cleanstats_sheet')
+        df = load_file(uploaded_file, sheet_name=sheet_name)
         with st.spinner("Processing..."):
             if df is not None:
             # Remove duplicate rows
@@ -379,40 +445,62 @@ def statistical_analysis():
 
                 # Display dataset
                 st.subheader("Dataset Preview:", divider='rainbow')
-                st.dataframe(df)
+                show_dataset_preview(dataset_path(uploaded_file, sheet_name), key='cleanstats_preview')
                 st.write("*Note: The dataset has been cleaned and missing values have been imputed. You can download the cleaned dataset for further analysis.*")
                 
+                # Correlation settings (kept outside the cached statistics call)
+                col1, col2 = st.columns(2)
+                correlation_method = col1.selectbox("Correlation method", ["pearson", "spearman", "kendall"], key='correlation_method')
+                top_k = col2.number_input("Top correlated pairs to show", min_value=5, max_value=500, value=50, step=5, key='correlation_top_k')
+
                 # Basic statistics
+                stats = clean_stats(df, correlation_method, int(top_k))
                 st.subheader("Basic Statistics:", divider='rainbow')
                 st.write("For numerical columns:")
-                st.write(df.describe().transpose())
+                st.write(stats["numerical_summary"])
 
                 st.write("For categorical columns:")
-                st.write(df.describe(include='object').transpose())
+                st.write(stats["categorical_summary"])
 
                 # Correlation analysis for numerical columns
                 st.subheader("Correlation Analysis:", divider='rainbow')
-                numerical_columns = df.select_dtypes(include=['int64', 'float64']).columns
-                correlation_matrix = df[numerical_columns].corr()
-                st.write(correlation_matrix)
+                if stats["correlation"] is not None:
+                    st.write(stats["correlation"])
+                else:
+                    st.write(f"Too many numerical columns for a full matrix, showing the {int(top_k)} strongest {correlation_method} correlations:")
+                    st.dataframe(stats["top_correlations"], use_container_width=True)
+                if len(stats["top_correlations"]) > 0:
+                    heatmap = correlation.clustered_heatmap(df, stats["top_correlations"], method=correlation_method)
+                    st.pyplot(heatmap)
+                    plt.close(heatmap)
 
                 # Skewness and Kurtosis for numerical columns
                 st.subheader("Skewness and Kurtosis:", divider='rainbow')
-                skewness = df.skew(numeric_only=True)
-                kurtosis = df.kurt(numeric_only=True)
-                skew_kurt_df = pd.DataFrame({
-                    'Skewness': skewness,
-                    'Kurtosis': kurtosis
-                })
-                st.write(skew_kurt_df)
+                st.write(stats["skew_kurt"])
 
                 # Unique Values Count
                 st.subheader("Unique Values Count:", divider='rainbow')
                 col1, col2 = st.columns(2)
                 col1.write("Categorical columns unique values:")
-                col1.write(df.select_dtypes(include=['object']).nunique())
+                col1.write(stats["categorical_unique"])
                 col2.write("Numerical columns unique values:")
-                col2.write(df.select_dtypes(include=[np.number]).nunique())
+                col2.write(stats["numerical_unique"])
+
+                # Time series aggregates (only when a datetime column was detected)
+                if stats["time_series"] is not None:
+                    ts_summary = stats["time_series"]
+                    st.subheader("Time Series Summary:", divider='rainbow')
+                    st.write(f"{ts_summary['rows']} observations from {ts_summary['start']:%Y-%m-%d} to {ts_summary['end']:%Y-%m-%d}, "
+                             f"about {ts_summary['periods_per_year']:.0f} per year.")
+                    if "total_return" in ts_summary:
+                        col1, col2, col3 = st.columns(3)
+                        col1.metric(f"Total return ({ts_summary['price_column']})", f"{ts_summary['total_return']:.2%}")
+                        col2.metric("Annualized volatility", f"{ts_summary['annualized_volatility']:.2%}")
+                        col3.metric("Max drawdown", f"{ts_summary['max_drawdown']:.2%}")
+                    st.write(f"Resampled aggregates (rule '{ts_summary['resample_rule']}'):")
+                    st.write(ts_summary["resampled"])
+                    if ts_summary["price_column"] is not None:
+                        st.line_chart(ts_summary["resampled"][ts_summary["price_column"]])
                 st.success("Data Cleaning & Statistical Analysis completed successfully!")
 
 ###################################################### Page 3: Data Visualization ######################################################
@@ -438,37 +526,20 @@ def data_visualization():
     with st.spinner("Generating Visualization..."):
         # Check if the file, visualization type, and user input are provided before generating the visualization
         if uploaded_file and visualization_type and user_input is not None:
-            # Get file name and path
             file_name = uploaded_file.name
-            file_path = os.path.join("uploads", file_name)
-
-            # Load the file based on its format and clean the data
-            df = load_file(uploaded_file)
-            df = df_cleaning(df)
-
-            # Extract a sample of the dataset for model understanding
-            df_sample = str(df.head())
+            sheet_name = select_sheet(uploaded_file, key='autoviz_sheet')
             # Columns for visualization
             columns = user_input
             
             # Add a subheader for the visualization
             st.subheader(f"{visualization_type} Visualization for the dataset '{file_name}' for the columns {columns}:")
             
-            # Provide a predefined prompt for the model
-            predefined_prompt = f"""Write a python code to plot a {visualization_type} using Matplotlib or Seaborn Library. Name of the dataset is {file_name}.
-            Plot for the dataset columns {columns}. Here's the sample of dataset {df_sample}. Set xticks rotation 90 degree. 
-            Set title in each plot. Add tight layout in necessary plots. Don't right the explanation, just write the code."""
-            
-            # Generate the code for the visualization
-            response = model.generate_content(predefined_prompt, generation_config=config)
-            generated_code = response.text
-            generated_code = generated_code.replace("```python", "").replace("```", "").strip()
-            
-            # Modify the code to insert the actual file path into pd.read_csv()
-            if "pd.read_csv" in generated_code:
-                generated_code = generated_code.replace("pd.read_csv()", f'pd.read_csv(r"{file_path}")')
-            elif "pd.read_excel" in generated_code:
-                generated_code = generated_code.replace("pd.read_excel()", f'pd.read_excel(r"{file_path}")')
+            # Generate the code for the visualization (with the stored file's path filled in)
+            try:
+                generated_code = pages.autoviz_code(uploaded_file, visualization_type, columns, genai_api_key, sheet_name)
+            except ValueError as e:
+                st.error(e)
+                st.stop()
 
             # Display the generated code
             st.code(generated_code, language='python')
@@ -492,30 +563,13 @@ def ai_recommendation():
         type_of_recommendation = st.radio("Type of Recommendation", ["Present Insight", "Future Insight"])
         if st.button("Submit"):
             with st.spinner("Processing..."):
-                file_name = uploaded_file.name
                 st.subheader("Recommendation:")
-                file_path = os.path.join(os.getcwd(), file_name)
-                with open(file_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-                # Upload the file to Gemini and wait for it to be active
-                files = [upload_to_gemini(file_name, mime_type="text/csv")]
-                wait_for_files_active(files)
-                # Start a chat session with the uploaded file
-                chat_session = model.start_chat(
-                history=[
-                    {
-                    "role":"user",
-                    "parts":extract_csv_data(file_name)
-                    },
-                ]
-                )
-                # Send the question
-                question = f""""Provide {type_of_recommendation} based on the dataset {file_name}. If dataset is related to financial or healthcare 
-                , just give your best recommendation, don't think about advisor or expertise thing. Mention also 
-                that recommendation is generated by AI, first give your essential recommendations. So, the user take the final decision on 
-                their own. Warn user about AI recommendation but, do your work."""
-                response = chat_session.send_message(question)
-                st.write(response.text)
+                try:
+                    recommendation = pages.futurecast(uploaded_file, type_of_recommendation, genai_api_key)
+                except ValueError as e:
+                    st.error(e)
+                    st.stop()
+                st.write(recommendation)
                 st.success("Recommendation generated successfully!")
 
 ###################################################### Page 5: Analysis Report ######################################################
@@ -525,24 +579,24 @@ def analysis_report():
     st.write('Upload a dataset to generate a report:')
     uploaded_file = st.file_uploader("Upload a dataset", type=["csv", "xlsx"])
     if uploaded_file is not None:
+        sheet_name = select_sheet(uploaded_file, key='insightgen_sheet')
         if st.button("Submit"):
             with st.spinner("Processing..."):
-                filename = uploaded_file.name
-                df = load_file(uploaded_file)
+                try:
+                    generated_report = pages.report_text(uploaded_file, genai_api_key, sheet_name)
+                except ValueError as e:
+                    st.error(e)
+                    st.stop()
                 st.success("File uploaded successfully!")
-                if df is not None:
-                    # Gemini Text Report Generation
-                    summary = df.describe().transpose().to_string()
-                    prompt = f"""Generate a text report for {filename} dataset using Gemini AI. Here's the summary of the dataset: {summary}.
-                            Try to make the report in bullet points and use numbers for better readability and understanding."""
-                    response = model.generate_content(prompt, generation_config=config)
-                    generated_report = response.text
-                    st.write(generated_report)
-                    st.success("Report generated successfully!")
+                st.write(generated_report)
+                st.success("Report generated successfully!")
 
             st.write("Wait for the report to be generated...")
             with st.spinner("Generating Report..."):
-                # Generate a report in HTML format for download
+                # Generate a report in HTML format for download (the profile needs every column)
+                df = load_file(uploaded_file, sheet_name=sheet_name)
+                if df is None:
+                    st.stop()
                 report_path = generate_report(df, uploaded_file)
                 with open(report_path, 'rb') as f:
                     st.download_button(
@@ -562,29 +616,22 @@ def ai_data_file_chatbot():
         st.success("File uploaded successfully!")
         # Get the user question
         question = st.text_input("Ask a question:", key="question")
+        local_query = st.toggle("Compute answers locally (only the column schema is sent to Gemini)", value=True, key="smartquery_local")
         if st.button("Submit"):
             with st.spinner("Processing..."):
-                file_name = uploaded_file.name
                 st.subheader("ChatBot Response:")
-                file_path = os.path.join(os.getcwd(), file_name)
-                with open(file_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-
-                # Upload the file to Gemini and wait for it to be active
-                files = [upload_to_gemini(file_name, mime_type="text/csv")]
-                wait_for_files_active(files)
-                # Start a chat session with the uploaded file
-                chat_session = model.start_chat(
-                history=[
-                    {
-                    "role":"user",
-                    "parts":extract_csv_data(file_name)
-                    },
-                ]
-                )
-                # Send the user question to the chatbot for response
-                response = chat_session.send_message(question)
-                st.write(response.text)
+                try:
+                    reply = pages.smartquery(uploaded_file, question, genai_api_key, local=local_query)
+                except ValueError as e:
+                    st.error(e)
+                    st.stop()
+                if reply["local_error"] is not None:
+                    st.info(f"Could not answer locally ({reply['local_error']}), sent the dataset to Gemini instead.")
+                if reply["plan"] is not None:
+                    with st.expander("Query plan and result"):
+                        st.json(reply["plan"])
+                        st.dataframe(reply["result"].head(query_plan.MAX_RESULT_ROWS), use_container_width=True)
+                st.write(reply["answer"])
 
 ###################################################### Page 7: Vision Analysis ######################################################
 def vision_analysis():
@@ -604,8 +651,12 @@ def vision_analysis():
                 st.divider()
                 image = Image.open(uploaded_image)
                 prompt = f"Analyze the image and provide a detailed description of the image. {user_query}"
-                response = model.generate_content([prompt,image], stream=True)
-                response.resolve()
+                def analyze_image():
+                    response = model.generate_content([prompt,image], stream=True)
+                    response.resolve()
+                    return response
+                with tracing.span("gemini.generate_content"):
+                    response = scheduler.call(analyze_image, key=genai_api_key, priority=PRIORITY_INTERACTIVE)
                 st.write(response.text)
                 st.success("Image analyzed successfully!")
 
@@ -646,7 +697,8 @@ def contact_us():
                         updated_df = pd.concat([feedback_df, user_feedback_data], ignore_index=True)
 
                         # Update Google Sheets with new Feedback Data
-                        conn.update(worksheet="Feedback", data=updated_df)
+                        with tracing.span("sheets.update"):
+                            conn.update(worksheet="Feedback", data=updated_df)
                         st.success("Feedback submitted successfully!")
 
     if action == "Query":
@@ -682,7 +734,8 @@ def contact_us():
                         updated_df = pd.concat([query_df, user_query_data], ignore_index=True)
 
                         # Update Google Sheets with new Query Data
-                        conn.update(worksheet="Query", data=updated_df)
+                        with tracing.span("sheets.update"):
+                            conn.update(worksheet="Query", data=updated_df)
                         st.success("Query submitted successfully!")
             
 ###################################################### Page 8: About Us ######################################################
@@ -717,7 +770,51 @@ def about_us():
     """, unsafe_allow_html=True
 )
 
+###################################################### Page 9: Metrics (Admin) ######################################################
+# Admins are users with the 'admin' role in config.yaml or listed in AURORA_ADMIN_USERS
+def is_admin():
+    admin_users = [u.strip() for u in os.getenv("AURORA_ADMIN_USERS", "").split(",") if u.strip()]
+    roles = st.session_state.get("roles") or []
+    return "admin" in roles or st.session_state.get("username") in admin_users
+
+def metrics_dashboard():
+    st.header('📊Metrics: Stage Latency & Memory', divider='rainbow')
+    if not is_admin():
+        st.error("This page is only available to admins.")
+        st.stop()
+    if not tracing.is_enabled():
+        st.warning("Tracing is disabled. Start the app with AURORA_TRACING=1 to collect metrics.")
+        if st.button("Enable tracing for this server"):
+            tracing.enable()
+            st.rerun()
+
+    st.subheader("Latency per stage:", divider='rainbow')
+    summary = pd.DataFrame(tracing.registry.summary())
+    if summary.empty:
+        st.write("No spans recorded yet.")
+    else:
+        st.dataframe(summary, use_container_width=True)
+
+    st.subheader("Gemini queue:", divider='rainbow')
+    st.write(scheduler.stats())
+
+    st.subheader("Recent spans:", divider='rainbow')
+    st.dataframe(pd.DataFrame(tracing.registry.recent_spans()[::-1]), use_container_width=True)
+
+    st.download_button(
+        label="Download Prometheus metrics",
+        data=tracing.registry.to_prometheus(),
+        file_name="aurora_metrics.prom",
+        mime="text/plain"
+    )
+
 ###################################################### Navigation ######################################################
+# Gemini queue status in the sidebar
+with st.sidebar:
+    scheduler_stats = scheduler.stats()
+    st.caption(f"Gemini queue: {scheduler_stats['queue_depth']} waiting, {scheduler_stats['active']} running, "
+               f"avg wait {scheduler_stats['avg_wait_s']:.1f}s")
+
 if st.session_state["authentication_status"]:
     pg = st.navigation([
         st.Page(introduction, title='Home', icon='🏠'),
@@ -729,5 +826,6 @@ if st.session_state["authentication_status"]:
         st.Page(vision_analysis, title='VisionFusion', icon='👁️'),
         st.Page(contact_us, title='Contact Us', icon='📧'),
         st.Page(about_us, title='About Us', icon='👨‍💻')
-    ])
+    ] + ([st.Page(metrics_dashboard, title='Metrics', icon='📊')] if is_admin() else []))
+    tracing.set_context(page=pg.title)
     pg.run()
\ No newline at end of file
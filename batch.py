@@ -0,0 +1,220 @@
+import os
+import sys
+import json
+import glob
+import time
+import hashlib
+import argparse
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import data_pipeline
+
+# Headless batch mode: run the CleanStats pipeline (cleaning + statistics) and
+# the InsightGen profile report over many datasets without the Streamlit UI.
+#
+#   python batch.py exports/ -o batch_output --workers 8
+#   python batch.py a.csv b.xlsx -o batch_output --no-profile
+#
+# or from Python:
+#
+#   from batch import run_batch
+#   summary = run_batch(["exports/"], "batch_output", workers=8)
+#
+# Every dataset gets <output>/<name>/cleaned.parquet, stats.json and (unless
+# disabled) <name>_report.html. Finished files are appended to
+# <output>/progress.jsonl, so an interrupted run picks up where it stopped;
+# a file is redone only when its size or modification time changed.
+
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx")
+PROGRESS_FILE = "progress.jsonl"
+SUMMARY_FILE = "summary.json"
+
+
+# Expand files, directories (recursively) and glob patterns into a sorted list of dataset paths
+def collect_inputs(inputs):
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for directory, _, files in os.walk(item):
+                for name in files:
+                    if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                        paths.add(os.path.abspath(os.path.join(directory, name)))
+        else:
+            for path in glob.glob(item) or [item]:
+                if path.lower().endswith(SUPPORTED_EXTENSIONS) and os.path.isfile(path):
+                    paths.add(os.path.abspath(path))
+    return sorted(paths)
+
+
+# Output directory name for a dataset; the path hash keeps same-named files in different folders apart
+def output_name(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}_{hashlib.sha256(os.path.dirname(path).encode('utf-8')).hexdigest()[:8]}"
+
+
+# Make the statistics (DataFrames, Series, numpy and pandas scalars) JSON serializable
+def to_jsonable(value):
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient="split", date_format="iso", default_handler=str))
+    if isinstance(value, pd.Series):
+        return json.loads(value.to_json(orient="index", date_format="iso", default_handler=str))
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+
+# Process one dataset; runs in a worker process and never raises
+def process_file(path, output_dir, profile=True):
+    result = {"path": path, "output": None, "status": "ok", "error": None, "profile": profile, "timings": {}}
+    timings = result["timings"]
+    start_total = time.perf_counter()
+    try:
+        # Inside the try: the file may have been removed since it was collected
+        result.update(_fingerprint(path))
+        target = os.path.join(output_dir, output_name(path))
+        os.makedirs(target, exist_ok=True)
+        result["output"] = target
+
+        start = time.perf_counter()
+        df = data_pipeline.load_file(path)
+        timings["load"] = time.perf_counter() - start
+        result["rows"], result["columns"] = df.shape
+
+        start = time.perf_counter()
+        cleaned = data_pipeline.df_cleaning(df)
+        timings["clean"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cleaned.rename(columns=str).to_parquet(os.path.join(target, "cleaned.parquet"), index=False)
+        timings["write_parquet"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stats = data_pipeline.clean_stats(cleaned)
+        with open(os.path.join(target, "stats.json"), "w", encoding="utf-8") as file:
+            json.dump(to_jsonable(stats), file, indent=2)
+        timings["stats"] = time.perf_counter() - start
+
+        if profile:
+            start = time.perf_counter()
+            data_pipeline.generate_report(cleaned, os.path.basename(path), output_dir=target)
+            timings["profile"] = time.perf_counter() - start
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    timings["total"] = time.perf_counter() - start_total
+    return result
+
+
+# Completed entries from earlier runs, keyed by path (later lines win)
+def load_progress(output_dir):
+    done = {}
+    path = os.path.join(output_dir, PROGRESS_FILE)
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a partial last line
+                continue
+            done[entry["path"]] = entry
+    return done
+
+
+def run_batch(inputs, output_dir, workers=None, profile=True, resume=True, log=print):
+    os.makedirs(output_dir, exist_ok=True)
+    paths = collect_inputs(inputs)
+    done = load_progress(output_dir) if resume else {}
+
+    pending, skipped = [], []
+    for path in paths:
+        entry = done.get(path)
+        # A run without profiles does not count as done for a run that wants them
+        done_before = (entry and entry["status"] == "ok" and (entry.get("profile", False) or not profile)
+                       and all(entry.get(k) == v for k, v in _fingerprint(path).items()))
+        if done_before:
+            skipped.append(entry)
+        else:
+            pending.append(path)
+    log(f"{len(paths)} datasets found, {len(skipped)} already done, {len(pending)} to process")
+
+    results = []
+    progress_path = os.path.join(output_dir, PROGRESS_FILE)
+    with open(progress_path, "a", encoding="utf-8") as progress:
+        def record(result):
+            results.append(result)
+            progress.write(json.dumps({k: v for k, v in result.items() if k != "traceback"}) + "\n")
+            progress.flush()
+            status = "ok" if result["status"] == "ok" else f"FAILED ({result['error']})"
+            log(f"[{len(results)}/{len(pending)}] {result['path']}: {status} in {result['timings']['total']:.2f}s")
+
+        if workers == 1 or len(pending) <= 1:
+            for path in pending:
+                record(process_file(path, output_dir, profile))
+        else:
+            # spawn keeps the workers independent of any threads in the parent
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = [pool.submit(process_file, path, output_dir, profile) for path in pending]
+                for future in as_completed(futures):
+                    record(future.result())
+
+    summary = {
+        "processed": len(results),
+        "skipped": len(skipped),
+        "failed": sum(1 for r in results if r["status"] != "ok"),
+        "files": sorted(results + skipped, key=lambda r: r["path"]),
+    }
+    with open(os.path.join(output_dir, SUMMARY_FILE), "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=2, default=str)
+    return summary
+
+
+# Per-file timing table for the console
+def format_summary(summary):
+    stages = ["load", "clean", "write_parquet", "stats", "profile", "total"]
+    lines = [f"{'file':<50} {'status':<7} " + " ".join(f"{s:>13}" for s in stages)]
+    for entry in summary["files"]:
+        timings = entry.get("timings", {})
+        cells = " ".join(f"{timings[s]:>12.3f}s" if s in timings else f"{'-':>13}" for s in stages)
+        lines.append(f"{os.path.basename(entry['path'])[:50]:<50} {entry['status']:<7} {cells}")
+    lines.append(f"processed {summary['processed']}, skipped {summary['skipped']}, failed {summary['failed']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run CleanStats and InsightGen over many datasets without the UI.")
+    parser.add_argument("inputs", nargs="+", help="CSV/XLSX files, directories or glob patterns")
+    parser.add_argument("-o", "--output", default="batch_output", help="Output directory")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--no-profile", action="store_true", help="Skip the HTML profile reports")
+    parser.add_argument("--no-resume", action="store_true", help="Reprocess files already recorded as done")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.inputs, args.output, workers=args.workers, profile=not args.no_profile, resume=not args.no_resume)
+    print(format_summary(summary))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fake_genai as genai
+import columnar_store
+import ai_pages
+import tracing
+from scratch_store import ScratchStore
+from gemini_scheduler import GeminiScheduler
+from benchmarks.synthetic_data import parse_spec, generate_dataset
+
+# Load-testing harness for the AI pages, run against the local Gemini stand-in.
+#
+# Streamlit runs every session's script in its own thread of one server
+# process, so each simulated session here is a thread that repeatedly runs the
+# server-side work of AutoViz, FutureCast, SmartQuery and InsightGen through
+# ai_pages, the same code app.py calls: scratch store writes, columnar ingest,
+# prompt building, the shared Gemini scheduler and the upload PROCESSING ->
+# ACTIVE lifecycle. Widgets and rendering are not simulated (app.py needs a
+# login and a Sheets connection to start).
+#
+#   python -m benchmarks.loadtest --sessions 20 --iterations 5
+#   python -m benchmarks.loadtest --sessions 50 --latency 1.5 --rate-limit-rate 0.05 --json loadtest.json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["autoviz", "futurecast", "smartquery", "insightgen"]
+DEFAULT_DATASETS = ["ibm", "synthetic:rows=5000,cols=8"]
+
+
+class Upload:
+    # Minimal Streamlit UploadedFile look-alike
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+
+    def getvalue(self):
+        return self.data
+
+
+# Build the uploads for 'ibm', 'synthetic:...' specs and CSV paths
+def load_uploads(names):
+    uploads = []
+    for name in names:
+        if name == "ibm":
+            with open(os.path.join(ROOT, "daily_adjusted_IBM.csv"), "rb") as file:
+                uploads.append(Upload("daily_adjusted_IBM.csv", file.read()))
+        elif name.startswith("synthetic"):
+            df = generate_dataset(parse_spec(name.partition(":")[2]))
+            uploads.append(Upload(f"synthetic_{len(uploads)}.csv", df.to_csv(index=False).encode("utf-8")))
+        else:
+            with open(name, "rb") as file:
+                uploads.append(Upload(os.path.basename(name), file.read()))
+    return uploads
+
+
+# Runs each page through the same ai_pages.AIPages methods app.py calls, with fixed widget inputs
+class Harness:
+    def __init__(self, scheduler, scratch, dataset_dir, poll_seconds, with_report):
+        model = genai.GenerativeModel("gemini-1.5-flash")
+        config = genai.types.GenerationConfig(temperature=1.0, max_output_tokens=1500, top_p=0.95, top_k=64)
+        self.pages = ai_pages.AIPages(genai, model, config, scheduler, scratch, store_dir=dataset_dir, poll_seconds=poll_seconds)
+        self.with_report = with_report
+
+    def autoviz(self, upload, api_key):
+        return self.pages.autoviz_code(upload, "Line Chart", "the first two columns", api_key)
+
+    def futurecast(self, upload, api_key):
+        return self.pages.futurecast(upload, "Future Insight", api_key)
+
+    def smartquery(self, upload, api_key):
+        return self.pages.smartquery(upload, "What is the average of each numeric column?", api_key)["answer"]
+
+    def insightgen(self, upload, api_key):
+        text = self.pages.report_text(upload, api_key)
+        if self.with_report:
+            import data_pipeline
+            data_pipeline.generate_report(columnar_store.read_columns(self.pages.dataset_path(upload)), upload.name,
+                                          output_dir=tempfile.gettempdir())
+        return text
+
+
+# Track the highest current RSS while the test runs
+class RssSampler(threading.Thread):
+    def __init__(self, interval=0.2):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = tracing._rss_bytes()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, tracing._rss_bytes())
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def run_loadtest(sessions=10, iterations=3, pages=PAGES, uploads=None, poll_seconds=0.2, with_report=False,
+                 global_rpm=6000, per_key_rpm=600, max_concurrency=8, seed=0):
+    rng = random.Random(seed)
+    uploads = uploads or load_uploads(DEFAULT_DATASETS)
+    work_dir = tempfile.mkdtemp(prefix="aurora_loadtest_")
+    scheduler = GeminiScheduler(per_key_rpm=per_key_rpm, global_rpm=global_rpm, max_concurrency=max_concurrency,
+                                backoff_base=0.2, backoff_max=2.0)
+    scratch = ScratchStore(root=os.path.join(work_dir, "scratch"))
+    harness = Harness(scheduler, scratch, os.path.join(work_dir, "datasets"), poll_seconds, with_report)
+    results = []
+    lock = threading.Lock()
+
+    def session(index):
+        api_key = f"fake-key-{index}"
+        for _ in range(iterations):
+            for page in pages:
+                upload = rng.choice(uploads)
+                start = time.perf_counter()
+                error = None
+                try:
+                    getattr(harness, page)(upload, api_key)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                with lock:
+                    results.append({"page": page, "seconds": time.perf_counter() - start, "error": error})
+
+    sampler = RssSampler()
+    sampler.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        list(pool.map(session, range(sessions)))
+    elapsed = time.perf_counter() - start
+    sampler.stopped.set()
+    scheduler.shutdown()
+
+    report = {"sessions": sessions, "iterations": iterations, "elapsed_s": elapsed, "pages": {},
+              "peak_rss_mb": sampler.peak / (1024 * 1024), "scheduler": scheduler.stats(), "fake_calls": dict(genai.calls)}
+    for page in pages + ["all"]:
+        rows = [r for r in results if page == "all" or r["page"] == page]
+        ok = [r["seconds"] for r in rows if r["error"] is None]
+        report["pages"][page] = {
+            "requests": len(rows),
+            "errors": len(rows) - len(ok),
+            "throughput_rps": len(rows) / elapsed if elapsed else 0.0,
+            "mean_s": statistics.mean(ok) if ok else 0.0,
+            "p50_s": _percentile(ok, 0.50),
+            "p95_s": _percentile(ok, 0.95),
+            "p99_s": _percentile(ok, 0.99),
+            "max_s": max(ok) if ok else 0.0,
+        }
+    report["sample_errors"] = sorted({r["error"] for r in results if r["error"]})[:10]
+    return report
+
+
+def format_report(report):
+    lines = [f"{report['sessions']} sessions x {report['iterations']} iterations in {report['elapsed_s']:.1f}s, "
+             f"peak RSS {report['peak_rss_mb']:.0f} MB",
+             f"{'page':<12} {'requests':>8} {'errors':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"]
+    for page, row in report["pages"].items():
+        lines.append(f"{page:<12} {row['requests']:>8} {row['errors']:>7} {row['throughput_rps']:>8.2f} "
+                     f"{row['p50_s']:>7.2f}s {row['p95_s']:>7.2f}s {row['p99_s']:>7.2f}s {row['max_s']:>7.2f}s")
+    stats = report["scheduler"]
+    lines.append(f"scheduler: {stats['completed']} calls, {stats['coalesced']} coalesced, {stats['retries']} retries, "
+                 f"avg wait {stats['avg_wait_s']:.2f}s, p95 wait {stats['p95_wait_s']:.2f}s")
+    for error in report["sample_errors"]:
+        lines.append(f"error: {error}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the AI pages against the local Gemini stand-in.")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent simulated Streamlit sessions")
+    parser.add_argument("--iterations", type=int, default=3, help="Page visits per session and page")
+    parser.add_argument("--pages", default=",".join(PAGES))
+    parser.add_argument("--dataset", action="append", help="'ibm', a CSV path or 'synthetic:...' (see run_benchmarks)")
+    parser.add_argument("--latency", type=float, default=genai.settings.latency, help="Mean fake Gemini latency (s)")
+    parser.add_argument("--jitter", type=float, default=genai.settings.jitter)
+    parser.add_argument("--error-rate", type=float, default=genai.settings.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=genai.settings.rate_limit_rate, help="Share of calls answered with 429")
+    parser.add_argument("--processing", type=float, default=genai.settings.processing_seconds, help="Seconds uploaded files stay PROCESSING")
+    parser.add_argument("--poll", type=float, default=0.2, help="get_file polling interval (s)")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="Scheduler worker threads")
+    parser.add_argument("--global-rpm", type=float, default=6000)
+    parser.add_argument("--with-report", action="store_true", help="Also build the ydata profile in InsightGen")
+    parser.add_argument("--json", help="Write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    genai.settings.latency = args.latency
+    genai.settings.jitter = args.jitter
+    genai.settings.error_rate = args.error_rate
+    genai.settings.rate_limit_rate = args.rate_limit_rate
+    genai.settings.processing_seconds = args.processing
+
+    uploads = load_uploads(args.dataset or DEFAULT_DATASETS)
+    pages = [p.strip() for p in args.pages.split(",")]
+    unknown = set(pages) - set(PAGES)
+    if unknown:
+        parser.error(f"Unknown pages: {', '.join(sorted(unknown))}")
+
+    report = run_loadtest(args.sessions, args.iterations, pages, uploads, poll_seconds=args.poll,
+                          with_report=args.with_report, global_rpm=args.global_rpm, max_concurrency=args.max_concurrency)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
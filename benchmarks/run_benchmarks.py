@@ -0,0 +1,234 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import queue
+import statistics
+import traceback
+import multiprocessing as mp
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import data_pipeline
+import columnar_store
+from benchmarks.synthetic_data import parse_spec, spec_label, generate_dataset
+
+# Headless benchmark suite for the data pipeline.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.run_benchmarks
+#   python -m benchmarks.run_benchmarks --save-baseline benchmarks/baselines/local.json
+#   python -m benchmarks.run_benchmarks --compare benchmarks/baselines/local.json --threshold 0.25
+#   python -m benchmarks.run_benchmarks --dataset ibm --dataset synthetic:rows=200000,cols=50 --stages all
+#
+# Every stage runs in a fresh process so peak RSS is attributable to that stage.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IBM_CSV = os.path.join(ROOT, "daily_adjusted_IBM.csv")
+
+# ingest, read_columns and extract_dataset_data are the path the pages take through the columnar copy
+STAGES = ["load_file", "ingest", "read_columns", "extract_dataset_data", "df_cleaning", "clean_stats", "generate_report"]
+DEFAULT_STAGES = ["load_file", "ingest", "read_columns", "extract_dataset_data", "df_cleaning", "clean_stats"]
+DEFAULT_DATASETS = [
+    "ibm",
+    "synthetic:rows=10000,cols=10",
+    "synthetic:rows=2000,cols=200,null_rate=0.1",
+    "synthetic:rows=200000,cols=8,cardinality=1000",
+]
+
+# Differences below these floors are treated as noise when comparing baselines
+MIN_SECONDS_DELTA = 0.05
+MIN_RSS_MB_DELTA = 16.0
+STAGE_TIMEOUT_SECONDS = 3600
+
+
+class StageError(RuntimeError):
+    pass
+
+
+# Peak RSS of the current process in MB (ru_maxrss is KB on Linux, bytes on macOS)
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+# Write each requested dataset to a CSV file and return {label: path}
+def prepare_datasets(names, work_dir):
+    datasets = {}
+    for name in names:
+        if name == "ibm":
+            datasets["ibm"] = IBM_CSV
+        elif name.startswith("synthetic"):
+            spec = parse_spec(name.partition(":")[2])
+            label = spec_label(spec)
+            path = os.path.join(work_dir, f"synthetic_{len(datasets)}.csv")
+            generate_dataset(spec).to_csv(path, index=False)
+            datasets[label] = path
+        elif os.path.exists(name):
+            datasets[os.path.basename(name)] = name
+        else:
+            raise ValueError(f"Unknown dataset: {name}")
+    return datasets
+
+
+# Runs inside a child process: prepare the inputs, then time a single stage.
+# Failures are reported through the queue so the parent never waits for a result that will not come.
+def _run_stage(path, stage, out_dir, results):
+    try:
+        df = None
+        if stage in ("df_cleaning", "clean_stats", "generate_report"):
+            df = data_pipeline.load_file(path)
+        if stage in ("clean_stats", "generate_report"):
+            df = data_pipeline.df_cleaning(df)
+        # A fresh store per run, so ingest always converts and never hits the cache
+        store_dir = tempfile.mkdtemp(dir=out_dir)
+        with open(path, "rb") as file:
+            data = file.read()
+        dataset = columnar_store.ingest(os.path.basename(path), data, store_dir=store_dir) if stage in ("read_columns", "extract_dataset_data") else None
+
+        rss_before = peak_rss_mb()
+        start = time.perf_counter()
+        if stage == "load_file":
+            data_pipeline.load_file(path)
+        elif stage == "df_cleaning":
+            data_pipeline.df_cleaning(df)
+        elif stage == "clean_stats":
+            data_pipeline.clean_stats(df)
+        elif stage == "ingest":
+            columnar_store.ingest(os.path.basename(path), data, store_dir=store_dir)
+        elif stage == "read_columns":
+            # What FutureCast and InsightGen read: the numeric columns only
+            columnar_store.read_columns(dataset, columnar_store.numeric_columns(dataset))
+        elif stage == "extract_dataset_data":
+            columnar_store.extract_dataset_data(dataset, os.path.basename(path))
+        elif stage == "generate_report":
+            data_pipeline.generate_report(df, os.path.basename(path), output_dir=out_dir)
+        seconds = time.perf_counter() - start
+        rss_after = peak_rss_mb()
+        results.put({"seconds": seconds, "peak_rss_mb": rss_after, "rss_delta_mb": rss_after - rss_before})
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc()})
+
+
+def run_stage(path, stage, out_dir, timeout=STAGE_TIMEOUT_SECONDS):
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    process = ctx.Process(target=_run_stage, args=(path, stage, out_dir, results))
+    process.start()
+    deadline = time.monotonic() + timeout
+    result = None
+    try:
+        # Poll so a child that dies without reporting (killed, out of memory) is noticed
+        while result is None:
+            try:
+                result = results.get(timeout=1)
+            except queue.Empty:
+                if not process.is_alive():
+                    # Pick up a result that was written just before the process exited
+                    try:
+                        result = results.get(timeout=1)
+                    except queue.Empty:
+                        raise StageError(f"{stage} on {path}: worker exited with code {process.exitcode} without a result")
+                elif time.monotonic() > deadline:
+                    raise StageError(f"{stage} on {path}: no result after {timeout}s")
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+    if "error" in result:
+        raise StageError(f"{stage} on {path}: {result['error']}\n{result['traceback']}")
+    return result
+
+
+def run_benchmarks(dataset_names, stages, repeat=3, timeout=STAGE_TIMEOUT_SECONDS):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="aurora_bench_") as work_dir:
+        datasets = prepare_datasets(dataset_names, work_dir)
+        for label, path in datasets.items():
+            for stage in stages:
+                runs = [run_stage(path, stage, work_dir, timeout) for _ in range(repeat)]
+                results[f"{label}|{stage}"] = {
+                    "seconds": statistics.median(r["seconds"] for r in runs),
+                    "min_seconds": min(r["seconds"] for r in runs),
+                    "peak_rss_mb": max(r["peak_rss_mb"] for r in runs),
+                    "rss_delta_mb": max(r["rss_delta_mb"] for r in runs),
+                    "repeat": repeat,
+                }
+                row = results[f"{label}|{stage}"]
+                print(f"{label:<90} {stage:<22} {row['seconds']:>9.4f}s {row['rss_delta_mb']:>+9.1f} MB "
+                      f"(peak {row['peak_rss_mb']:.1f} MB)", flush=True)
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+# Return a list of human readable regressions against a saved baseline
+def compare(current, baseline, threshold):
+    regressions = []
+    for key, base in baseline["results"].items():
+        now = current["results"].get(key)
+        if now is None:
+            continue
+        if now["seconds"] > base["seconds"] * (1 + threshold) and now["seconds"] - base["seconds"] > MIN_SECONDS_DELTA:
+            regressions.append(f"{key}: time {base['seconds']:.4f}s -> {now['seconds']:.4f}s")
+        # The stage's own growth, not the process peak that imports dominate
+        if now["rss_delta_mb"] > base["rss_delta_mb"] * (1 + threshold) and now["rss_delta_mb"] - base["rss_delta_mb"] > MIN_RSS_MB_DELTA:
+            regressions.append(f"{key}: RSS growth {base['rss_delta_mb']:.1f} MB -> {now['rss_delta_mb']:.1f} MB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Aurora data pipeline.")
+    parser.add_argument("--dataset", action="append", help="'ibm', a CSV/XLSX path, or 'synthetic:rows=..,cols=..,null_rate=..,cardinality=..,dtypes=float|int|object|datetime|bool,seed=..'")
+    parser.add_argument("--stages", default=",".join(DEFAULT_STAGES), help=f"Comma separated stages or 'all' ({', '.join(STAGES)})")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save-baseline", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare against this baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression (0.25 = 25%%)")
+    parser.add_argument("--timeout", type=float, default=STAGE_TIMEOUT_SECONDS, help="Seconds a single stage run may take")
+    args = parser.parse_args(argv)
+
+    stages = STAGES if args.stages == "all" else [s.strip() for s in args.stages.split(",")]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    try:
+        current = run_benchmarks(args.dataset or DEFAULT_DATASETS, stages, repeat=args.repeat, timeout=args.timeout)
+    except (StageError, ValueError) as e:
+        print(f"Benchmark failed: {e}", file=sys.stderr)
+        return 2
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as file:
+            json.dump(current, file, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print("Regressions beyond threshold:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions beyond threshold.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
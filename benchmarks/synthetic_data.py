@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+# Synthetic dataset generator for the benchmarks. Every dataset is fully
+# determined by its spec (including the seed), so runs are reproducible.
+
+DEFAULT_SPEC = {
+    "rows": 10000,
+    "cols": 10,
+    "null_rate": 0.05,
+    "cardinality": 50,
+    "dtypes": "float,int,object",
+    "seed": 0,
+}
+
+
+# Parse a spec string like "rows=100000,cols=20,null_rate=0.1,dtypes=float|object"
+def parse_spec(text):
+    spec = dict(DEFAULT_SPEC)
+    if not text:
+        return spec
+    for item in text.split(","):
+        key, _, value = item.partition("=")
+        key = key.strip()
+        if key not in spec:
+            raise ValueError(f"Unknown synthetic spec key: {key}")
+        if key == "dtypes":
+            spec[key] = value.replace("|", ",")
+        elif key == "null_rate":
+            spec[key] = float(value)
+        else:
+            spec[key] = int(value)
+    return spec
+
+
+# Short label for reports and baseline files
+def spec_label(spec):
+    dtypes = spec["dtypes"].replace(",", "|")
+    return (f"synthetic:rows={spec['rows']},cols={spec['cols']},null_rate={spec['null_rate']},"
+            f"cardinality={spec['cardinality']},dtypes={dtypes},seed={spec['seed']}")
+
+
+# Consecutive timestamps as text; daily for up to a century, finer for longer series so dates stay in range
+def _timestamps(rows):
+    if rows <= 36_500:
+        return pd.date_range("2000-01-01", periods=rows, freq="D").strftime("%Y-%m-%d").to_numpy(dtype=object)
+    freq = "h" if rows <= 2_000_000 else "min"
+    return pd.date_range("2000-01-01", periods=rows, freq=freq).strftime("%Y-%m-%d %H:%M").to_numpy(dtype=object)
+
+
+# Generate a DataFrame with columns cycling through the requested dtypes
+def generate_dataset(spec):
+    rng = np.random.default_rng(spec["seed"])
+    rows = spec["rows"]
+    dtypes = [d.strip() for d in spec["dtypes"].split(",") if d.strip()]
+    categories = np.array([f"cat_{i}" for i in range(max(1, spec["cardinality"]))], dtype=object)
+    columns = {}
+    for i in range(spec["cols"]):
+        dtype = dtypes[i % len(dtypes)]
+        if dtype == "float":
+            values = rng.normal(100, 25, rows)
+        elif dtype == "int":
+            values = rng.integers(0, max(2, spec["cardinality"]), rows).astype("int64")
+        elif dtype == "object":
+            values = categories[rng.integers(0, len(categories), rows)]
+        elif dtype == "datetime":
+            values = _timestamps(rows)
+        elif dtype == "bool":
+            values = rng.random(rows) < 0.5
+        else:
+            raise ValueError(f"Unknown synthetic dtype: {dtype}")
+        columns[f"{dtype}_{i}"] = values
+    df = pd.DataFrame(columns)
+
+    # Punch holes into the data (ints become floats, as they would after a CSV round trip)
+    if spec["null_rate"] > 0:
+        for column in df.columns:
+            if column.startswith("bool"):
+                continue
+            mask = rng.random(rows) < spec["null_rate"]
+            if mask.any():
+                if df[column].dtype == "int64":
+                    df[column] = df[column].astype("float64")
+                df.loc[mask, column] = np.nan
+    return df
@@ -0,0 +1,201 @@
+import io
+import os
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.ipc
+
+import data_pipeline
+import excel_ingest
+import scratch_store
+import timeseries
+
+# Canonical columnar copy of every uploaded dataset. Each upload is parsed once
+# (with the same pandas readers the pages always used, so dtypes do not change)
+# and written as an Arrow IPC file named after the content hash. Later stages
+# memory-map that file and read only the columns they need; the Arrow table is
+# zero-copy over the mapping, so repeated reads do not re-parse anything.
+
+# Kept inside the scratch store so its eviction and quota cover these files too
+DATASET_DIR = os.getenv("AURORA_DATASET_DIR", os.path.join(scratch_store.SCRATCH_DIR, "datasets"))
+
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# Convert a DataFrame to an Arrow table, stringifying object columns Arrow cannot type (mixed ints/strings)
+def _to_arrow(df):
+    df = df.rename(columns=str)
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        df = df.copy()
+        for column in df.select_dtypes(include=["object"]).columns:
+            df[column] = df[column].map(lambda v: v if v is None or v != v else str(v))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+# Write the table next to its final path and rename it into place, so readers never see a partial file
+def _write_atomic(table, path):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=64 * 1024)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _dataset_file(store_dir, digest, sheet_name=None):
+    if sheet_name is None:
+        return os.path.join(store_dir, f"{digest}.arrow")
+    sheet_digest = hashlib.sha256(str(sheet_name).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(store_dir, f"{digest}.{sheet_digest}.arrow")
+
+
+# Convert uploaded bytes (CSV/XLSX) into the canonical Arrow file once and return its path.
+# For workbooks, sheet_name picks the sheet (default: the first one).
+def ingest(name, data, store_dir=None, sheet_name=None):
+    store_dir = store_dir or DATASET_DIR
+    os.makedirs(store_dir, exist_ok=True)
+    path = _dataset_file(store_dir, content_digest(data), sheet_name)
+    try:
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        # Not converted yet, or evicted a moment ago
+        pass
+    buffer = io.BytesIO(data)
+    buffer.name = name
+    df = data_pipeline.load_file(buffer, sheet_name=sheet_name)
+    _write_atomic(_to_arrow(df), path)
+    return path
+
+
+# Convert several sheets of a workbook at once (parsed in parallel), returning {sheet name: path}
+def ingest_workbook(data, sheet_names=None, store_dir=None, max_workers=None):
+    store_dir = store_dir or DATASET_DIR
+    os.makedirs(store_dir, exist_ok=True)
+    digest = content_digest(data)
+    if sheet_names is None:
+        sheet_names = [s["name"] for s in excel_ingest.sheet_metadata(data) if not s["hidden"]]
+    paths = {name: _dataset_file(store_dir, digest, name) for name in sheet_names}
+    missing = []
+    for name, path in paths.items():
+        try:
+            # Sheets still in use must not age out of the scratch store
+            os.utime(path)
+        except FileNotFoundError:
+            missing.append(name)
+    if missing:
+        frames = excel_ingest.read_sheets(data, missing, max_workers=max_workers)
+        for name, df in frames.items():
+            _write_atomic(_to_arrow(df), paths[name])
+    return paths
+
+
+_background = None
+_background_lock = threading.Lock()
+_background_queued = set()
+
+
+# Convert the remaining sheets of a workbook on a background thread (once per workbook and store);
+# the sheet the user is looking at is ingested first with ingest(), so nobody waits for the others
+def ingest_workbook_background(data, store_dir=None):
+    global _background
+    store_dir = store_dir or DATASET_DIR
+    key = (store_dir, content_digest(data))
+    with _background_lock:
+        if key in _background_queued:
+            return None
+        _background_queued.add(key)
+        if _background is None:
+            _background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aurora-workbook-ingest")
+
+    def run():
+        try:
+            return ingest_workbook(data, store_dir=store_dir)
+        except Exception as e:
+            # Those sheets are converted on demand by ingest() instead
+            print(f"Background workbook conversion failed: {e}")
+            with _background_lock:
+                _background_queued.discard(key)
+
+    return _background.submit(run)
+
+
+# Memory-mapped Arrow table, optionally projected to a few columns (zero-copy)
+def read_table(path, columns=None):
+    source = pa.memory_map(path, "r")
+    table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(list(columns))
+    return table
+
+
+# DataFrame for the requested columns only
+def read_columns(path, columns=None):
+    return read_table(path, columns).to_pandas()
+
+
+# First n rows without materializing the rest of the file
+def head(path, n=5, columns=None):
+    source = pa.memory_map(path, "r")
+    reader = pa.ipc.open_file(source)
+    batches = []
+    rows = 0
+    for i in range(reader.num_record_batches):
+        if rows >= n:
+            break
+        batch = reader.get_batch(i)
+        batches.append(batch)
+        rows += batch.num_rows
+    if not batches:
+        return reader.schema.empty_table().to_pandas()
+    table = pa.Table.from_batches(batches).slice(0, n)
+    if columns is not None:
+        table = table.select(list(columns))
+    return table.to_pandas()
+
+
+# Column names and types, read from the file footer without touching the data
+def schema(path):
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).schema
+
+
+def num_rows(path):
+    return read_table(path).num_rows
+
+
+# Names of the numeric (integer, float, decimal) columns, from the schema alone
+def numeric_columns(path):
+    return [field.name for field in schema(path)
+            if pa.types.is_integer(field.type) or pa.types.is_floating(field.type) or pa.types.is_decimal(field.type)]
+
+
+# Columns a time-series summary needs: the detected datetime column (found on a small sample) and the numeric ones.
+# None when the dataset has no datetime column.
+def time_series_columns(path, sample_rows=200):
+    column = timeseries.detect_datetime_column(head(path, sample_rows))
+    if column is None:
+        return None
+    return [column] + [c for c in numeric_columns(path) if c != column]
+
+
+# Prompt parts for the chat pages, built batch by batch from the Arrow file
+# (same layout as data_pipeline.extract_csv_data, without re-reading the CSV text)
+def extract_dataset_data(path, name):
+    table = read_table(path)
+    parts = [f"---START OF CSV ${name} ---", " ".join(table.column_names)]
+    for batch in table.to_batches():
+        rows = batch.to_pandas().to_csv(sep=" ", header=False, index=False, lineterminator="\n")
+        parts.extend(rows.splitlines())
+    return parts
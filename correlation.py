@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+# Correlation analysis that scales to wide tables. Instead of materializing
+# the full p x p matrix, columns are standardized once and multiplied block by
+# block (numpy releases the GIL, so blocks can run on threads); only the top-k
+# absolute correlations, or those above a threshold, are kept. The heatmap only
+# shows the columns involved in those pairs, ordered by hierarchical clustering.
+# Missing values are handled pairwise (like DataFrame.corr): each pair only
+# uses the rows where both columns are present. Spearman ranks each column over
+# its present values, so with gaps it can differ slightly from pandas, which
+# re-ranks every pair's common rows. The working matrices are float32 and very
+# wide tables are sampled to MAX_SAMPLE_CELLS, so memory stays bounded.
+
+FULL_MATRIX_MAX_COLUMNS = 30
+DEFAULT_SAMPLE_ROWS = 200_000
+MAX_SAMPLE_CELLS = 50_000_000
+MIN_SAMPLE_ROWS = 20_000
+
+
+# Rows used for the correlations: at most sample_rows, and fewer on very wide tables so the
+# matrices stay within MAX_SAMPLE_CELLS. The full matrix and the top pairs use the same sample.
+def sample_rows_for(df, sample_rows=DEFAULT_SAMPLE_ROWS, seed=0):
+    if sample_rows is not None and df.shape[1]:
+        sample_rows = min(sample_rows, max(MIN_SAMPLE_ROWS, MAX_SAMPLE_CELLS // df.shape[1]))
+    if sample_rows is not None and len(df) > sample_rows:
+        return df.sample(n=sample_rows, random_state=seed)
+    return df
+
+
+def _numeric_matrix(df, method, sample_rows, seed):
+    numeric = sample_rows_for(df.select_dtypes(include=[np.number]), sample_rows, seed)
+    if method in ("spearman", "kendall"):
+        numeric = numeric.rank()
+    # float32 halves the working set; sums are accumulated by BLAS, counts stay exact below 2**24 rows
+    values = numeric.to_numpy(dtype=np.float32, copy=True)
+    missing = np.isnan(values)
+    mask = (~missing).astype(np.float32) if missing.any() else None
+    # Standardize over the present values; missing cells become 0 and are excluded through the mask
+    means = np.nanmean(values, axis=0, dtype=np.float64) if len(values) else np.zeros(values.shape[1])
+    values -= means.astype(np.float32)
+    values[missing] = 0.0
+    del missing
+    counts = mask.sum(axis=0, dtype=np.float64) if mask is not None else np.full(values.shape[1], len(values), dtype=np.float64)
+    std = np.sqrt(np.einsum("ij,ij->j", values, values, dtype=np.float64) / np.maximum(1, counts - 1))
+    keep = (std > 0) & (counts >= 2)
+    if not keep.all():
+        values = values[:, keep]
+        if mask is not None:
+            mask = mask[:, keep]
+    values /= std[keep].astype(np.float32)
+    # Squares for the pairwise variances, computed once instead of in every block
+    squares = values * values if mask is not None else None
+    return values, mask, squares, numeric.columns[keep], numeric
+
+
+# Correlations of two column blocks; with missing values each pair only uses the rows where both are present
+def _block_matrix(z, mask, squares, i, j, block_size):
+    a = z[:, i:i + block_size]
+    b = z[:, j:j + block_size]
+    if mask is None:
+        return (a.T @ b).astype(np.float64) / max(1, len(z) - 1)
+    ma = mask[:, i:i + block_size]
+    mb = mask[:, j:j + block_size]
+    n = (ma.T @ mb).astype(np.float64)
+    sx = (a.T @ mb).astype(np.float64)
+    sy = (ma.T @ b).astype(np.float64)
+    sxx = (squares[:, i:i + block_size].T @ mb).astype(np.float64)
+    syy = (ma.T @ squares[:, j:j + block_size]).astype(np.float64)
+    sxy = (a.T @ b).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / n
+        var = (sxx - sx * sx / n) * (syy - sy * sy / n)
+        block = np.where((n >= 2) & (var > 0), cov / np.sqrt(var), np.nan)
+    return np.clip(block, -1.0, 1.0)
+
+
+def _block_pairs(z, mask, squares, i, j, block_size, k, threshold):
+    block = _block_matrix(z, mask, squares, i, j, block_size)
+    rows, cols = np.indices(block.shape)
+    rows += i
+    cols += j
+    keep = (cols > rows) & ~np.isnan(block)
+    values = block[keep]
+    rows, cols = rows[keep], cols[keep]
+    if threshold is not None:
+        selected = np.abs(values) >= threshold
+        values, rows, cols = values[selected], rows[selected], cols[selected]
+    if k is not None and len(values) > k:
+        top = np.argpartition(-np.abs(values), k - 1)[:k]
+        values, rows, cols = values[top], rows[top], cols[top]
+    return values, rows, cols
+
+
+# Top correlated column pairs: DataFrame with column_1, column_2, correlation
+def top_correlations(df, method="pearson", k=50, threshold=None, block_size=256,
+                     sample_rows=DEFAULT_SAMPLE_ROWS, max_workers=None, seed=0):
+    if method not in ("pearson", "spearman", "kendall"):
+        raise ValueError(f"Unknown correlation method: {method}")
+    z, mask, squares, columns, numeric = _numeric_matrix(df, method, sample_rows, seed)
+    p = len(columns)
+    empty = pd.DataFrame(columns=["column_1", "column_2", "correlation"])
+    if p < 2:
+        return empty
+
+    starts = range(0, p, block_size)
+    tasks = [(i, j) for i in starts for j in starts if j >= i]
+    # Kendall is ranked with Spearman first, then the best candidates are recomputed exactly
+    candidates = k * 4 if method == "kendall" and k is not None else k
+    if max_workers == 1 or len(tasks) == 1:
+        results = [_block_pairs(z, mask, squares, i, j, block_size, candidates, threshold) for i, j in tasks]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(lambda t: _block_pairs(z, mask, squares, t[0], t[1], block_size, candidates, threshold), tasks))
+
+    values = np.concatenate([r[0] for r in results])
+    rows = np.concatenate([r[1] for r in results])
+    cols = np.concatenate([r[2] for r in results])
+    if len(values) == 0:
+        return empty
+    order = np.argsort(-np.abs(values), kind="stable")
+    if candidates is not None:
+        order = order[:candidates]
+    pairs = pd.DataFrame({
+        "column_1": columns[rows[order]],
+        "column_2": columns[cols[order]],
+        "correlation": values[order],
+    })
+
+    if method == "kendall":
+        pairs["correlation"] = [numeric[a].corr(numeric[b], method="kendall")
+                                for a, b in zip(pairs["column_1"], pairs["column_2"])]
+        if threshold is not None:
+            pairs = pairs[pairs["correlation"].abs() >= threshold]
+        pairs = pairs.reindex(pairs["correlation"].abs().sort_values(ascending=False).index)
+        if k is not None:
+            pairs = pairs.head(k)
+    return pairs.reset_index(drop=True)
+
+
+# Full correlation matrix of a few columns (used for narrow tables and the heatmap)
+def correlation_matrix(df, columns=None, method="pearson", sample_rows=DEFAULT_SAMPLE_ROWS, seed=0):
+    numeric = df.select_dtypes(include=[np.number]) if columns is None else df[list(columns)]
+    return sample_rows_for(numeric, sample_rows, seed).corr(method=method)
+
+
+# Order the columns of a correlation matrix so correlated columns sit together
+def cluster_order(matrix):
+    if len(matrix) < 3:
+        return list(matrix.columns)
+    from scipy.cluster.hierarchy import linkage, leaves_list
+    from scipy.spatial.distance import squareform
+    distance = 1 - matrix.abs().fillna(0).to_numpy()
+    np.fill_diagonal(distance, 0)
+    distance = np.clip((distance + distance.T) / 2, 0, None)
+    order = leaves_list(linkage(squareform(distance, checks=False), method="average"))
+    return list(matrix.columns[order])
+
+
+# Clustered heatmap of the columns involved in the strongest pairs (at most max_columns)
+def clustered_heatmap(df, pairs, max_columns=40, method="pearson"):
+    columns = []
+    for a, b in zip(pairs["column_1"], pairs["column_2"]):
+        for column in (a, b):
+            if column not in columns and len(columns) < max_columns:
+                columns.append(column)
+    fig, ax = plt.subplots(figsize=(min(16, 2 + 0.4 * len(columns)), min(14, 1.5 + 0.35 * len(columns))))
+    if len(columns) < 2:
+        ax.set_axis_off()
+        return fig
+    # A full Kendall matrix is too slow for a picture; Spearman shows the same structure
+    heatmap_method = "spearman" if method == "kendall" else method
+    matrix = correlation_matrix(df, columns, method=heatmap_method)
+    order = cluster_order(matrix)
+    sns.heatmap(matrix.loc[order, order], cmap="coolwarm", vmin=-1, vmax=1, center=0, ax=ax,
+                xticklabels=True, yticklabels=True)
+    ax.set_title(f"Clustered {heatmap_method.title()} correlation of the {len(columns)} most correlated columns")
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,112 @@
+import os
+import csv
+import pandas as pd
+import numpy as np
+from sklearn.impute import SimpleImputer
+from tracing import traced
+import timeseries
+import excel_ingest
+import correlation
+
+# Data functions shared by the Streamlit pages, the benchmarks and other
+# headless tools. Nothing in here may call st.*; app.py wraps these with
+# st.cache_data and turns errors into st.error messages.
+
+
+# Function for loading csv format file
+@traced()
+def load_csv_format(file):
+    df = pd.read_csv(file)
+    return df
+
+# Function for loading xlsx format file (calamine engine when available)
+@traced()
+def load_xlsx_format(file, sheet_name=0):
+    df = excel_ingest.read_sheet(file, sheet_name)
+    return df
+
+# Function for loading file based on its format (uploaded file or path)
+@traced()
+def load_file(file, sheet_name=None):
+    name = str(getattr(file, "name", file)).lower()
+    if name.endswith('.csv'):
+        return load_csv_format(file)
+    elif name.endswith('.xlsx'):
+        return load_xlsx_format(file, 0 if sheet_name is None else sheet_name)
+    else:
+        raise ValueError("Unsupported file format. Please upload a CSV or XLSX file.")
+
+# Function for data cleaning
+@traced()
+def df_cleaning(df):
+    df = df.drop_duplicates()
+
+    # Parse the datetime column (if any) so it is not mode-imputed as text
+    datetime_column = timeseries.detect_datetime_column(df)
+    if datetime_column is not None and df[datetime_column].dtype == object:
+        df[datetime_column] = pd.to_datetime(df[datetime_column], errors="coerce", format="mixed")
+
+    # Impute missing values
+    # Seperate numerical and object columns
+    numerical_columns = df.select_dtypes(include=['int64', 'float64']).columns
+    object_columns = df.select_dtypes(include=['object']).columns
+
+    # Impute missing values for numerical columns and object columns
+    if len(numerical_columns):
+        numerical_imputer = SimpleImputer(strategy='mean')
+        df[numerical_columns] = numerical_imputer.fit_transform(df[numerical_columns])
+
+    if len(object_columns):
+        object_imputer = SimpleImputer(strategy='most_frequent')
+        df[object_columns] = object_imputer.fit_transform(df[object_columns])
+    return df
+
+# Function for the CleanStats statistics
+@traced()
+def clean_stats(df, correlation_method="pearson", top_k=50):
+    numerical_columns = df.select_dtypes(include=['int64', 'float64']).columns
+    object_columns = df.select_dtypes(include=['object']).columns
+    stats = {
+        "numerical_summary": df.describe().transpose(),
+        "categorical_summary": df[object_columns].describe().transpose() if len(object_columns) else pd.DataFrame(),
+        # Full matrix only for narrow tables; wide tables get the top-k pairs only
+        "correlation": correlation.correlation_matrix(df[numerical_columns], method=correlation_method) if len(numerical_columns) <= correlation.FULL_MATRIX_MAX_COLUMNS else None,
+        "top_correlations": correlation.top_correlations(df[numerical_columns], method=correlation_method, k=top_k),
+        "skew_kurt": pd.DataFrame({
+            'Skewness': df.skew(numeric_only=True),
+            'Kurtosis': df.kurt(numeric_only=True)
+        }),
+        "categorical_unique": df.select_dtypes(include=['object']).nunique(),
+        "numerical_unique": df.select_dtypes(include=[np.number]).nunique(),
+        "time_series": None,
+    }
+
+    # Compact time-series aggregates when the data has a datetime column
+    ts = timeseries.to_time_index(df)
+    if ts is not None and len(ts) >= 2:
+        stats["time_series"] = timeseries.summarize(ts)
+    return stats
+
+# Function for extracting csv data
+@traced()
+def extract_csv_data(pathname: str) -> list[str]:
+    parts = [f"---START OF CSV ${pathname} ---"]
+    with open(pathname, "r", newline="") as csvfile:
+        reader = csv.reader(csvfile)
+        for row in reader:
+            parts.append(" ".join(row))
+    return parts
+
+# Function for generating report
+@traced()
+def generate_report(df, name, output_dir="reports"):
+    # Imported here because ydata_profiling is slow to import and most callers never need it
+    from ydata_profiling import ProfileReport
+
+    # Generate profiling report
+    profile = ProfileReport(df, title="Dataset Report", explorative=True)
+
+    # Save the report as an HTML file
+    output_path = os.path.join(output_dir, f"{name.split('.')[0]}_report.html")
+    profile.to_file(output_path)
+    return output_path
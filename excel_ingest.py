@@ -0,0 +1,119 @@
+import io
+import re
+import zipfile
+import posixpath
+import multiprocessing
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+# Faster XLSX ingestion. Cells are read with the calamine engine (Rust, no
+# workbook object model) when python-calamine is installed, falling back to
+# openpyxl otherwise. Sheet metadata comes straight from the workbook XML and
+# each sheet's <dimension> tag, so listing sheets never parses cells.
+
+try:
+    import python_calamine
+    ENGINE = "calamine"
+    _ENGINE_ERRORS = (python_calamine.CalamineError,)
+except ImportError:
+    ENGINE = "openpyxl"
+    _ENGINE_ERRORS = ()
+
+# What a corrupt or mislabeled workbook raises while being opened or parsed
+_WORKBOOK_ERRORS = (zipfile.BadZipFile, zipfile.LargeZipFile, KeyError, ET.ParseError, EOFError) + _ENGINE_ERRORS
+
+
+# Raised for files that are not readable workbooks; a ValueError like the other load errors
+class WorkbookError(ValueError):
+    pass
+
+# Below this workbook size, starting worker processes costs more than it saves
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+_DIMENSION = re.compile(rb'<(?:\w+:)?dimension\s+ref="([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?"')
+
+
+def _column_number(letters):
+    number = 0
+    for letter in letters.decode("ascii"):
+        number = number * 26 + (ord(letter) - ord("A") + 1)
+    return number
+
+
+def _as_bytes(file):
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            return f.read()
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    file.seek(0)
+    return file.read()
+
+
+# Sheet names, visibility and dimensions (rows including the header, columns)
+def sheet_metadata(file):
+    try:
+        return _sheet_metadata(_as_bytes(file))
+    except _WORKBOOK_ERRORS as e:
+        raise WorkbookError(f"Could not read the workbook, it may be corrupt or not an .xlsx file ({e}).") from e
+
+
+def _sheet_metadata(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+        rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        targets = {rel.get("Id"): rel.get("Target") for rel in rels if rel.tag.endswith("Relationship")}
+        sheets = []
+        for element in workbook.iter():
+            if not element.tag.endswith("}sheet"):
+                continue
+            rel_id = next((v for k, v in element.attrib.items() if k.endswith("}id")), None)
+            target = targets.get(rel_id, "")
+            path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+            rows = columns = None
+            try:
+                with archive.open(path) as sheet:
+                    match = _DIMENSION.search(sheet.read(64 * 1024))
+                if match:
+                    start_col, start_row, end_col, end_row = match.groups()
+                    end_col, end_row = end_col or start_col, end_row or start_row
+                    rows = int(end_row) - int(start_row) + 1
+                    columns = _column_number(end_col) - _column_number(start_col) + 1
+            except KeyError:
+                pass
+            sheets.append({
+                "name": element.get("name"),
+                "hidden": element.get("state", "visible") != "visible",
+                "rows": rows,
+                "columns": columns,
+            })
+    return sheets
+
+
+def read_sheet(file, sheet_name=0, engine=None):
+    data = _as_bytes(file)
+    try:
+        return pd.read_excel(io.BytesIO(data), sheet_name=sheet_name, engine=engine or ENGINE)
+    except _WORKBOOK_ERRORS as e:
+        raise WorkbookError(f"Could not read the workbook, it may be corrupt or not an .xlsx file ({e}).") from e
+
+
+def _read_sheet_worker(args):
+    data, sheet_name, engine = args
+    return sheet_name, read_sheet(data, sheet_name, engine)
+
+
+# Parse several sheets, in parallel processes for large workbooks with more than one sheet
+def read_sheets(file, sheet_names=None, max_workers=None, engine=None):
+    data = _as_bytes(file)
+    if sheet_names is None:
+        sheet_names = [s["name"] for s in sheet_metadata(data) if not s["hidden"]]
+    if len(sheet_names) <= 1 or max_workers == 1 or len(data) < PARALLEL_MIN_BYTES:
+        return {name: read_sheet(data, name, engine) for name in sheet_names}
+    # spawn, not fork: the Streamlit server process has threads running
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers or min(len(sheet_names), 4), mp_context=context) as pool:
+        return dict(pool.map(_read_sheet_worker, [(data, name, engine) for name in sheet_names]))
@@ -0,0 +1,168 @@
+import os
+import re
+import json
+import time
+import uuid
+import random
+import threading
+from types import SimpleNamespace
+
+# Local stand-in for the parts of google.generativeai the app uses:
+# configure, GenerativeModel.generate_content (with and without stream=True),
+# start_chat/send_message, upload_file/get_file with the PROCESSING -> ACTIVE
+# lifecycle, and types.GenerationConfig. Latency and error injection are
+# configured through `settings` (or AURORA_FAKE_* environment variables), so
+# the pages can be load tested without spending quota or network.
+#
+# Run the app against it with:  AURORA_FAKE_GEMINI=1 streamlit run app.py
+
+settings = SimpleNamespace(
+    latency=float(os.getenv("AURORA_FAKE_LATENCY", "0.5")),
+    jitter=float(os.getenv("AURORA_FAKE_JITTER", "0.2")),
+    error_rate=float(os.getenv("AURORA_FAKE_ERROR_RATE", "0")),
+    rate_limit_rate=float(os.getenv("AURORA_FAKE_RATE_LIMIT_RATE", "0")),
+    processing_seconds=float(os.getenv("AURORA_FAKE_PROCESSING_SECONDS", "1.0")),
+    failed_upload_rate=float(os.getenv("AURORA_FAKE_FAILED_UPLOAD_RATE", "0")),
+    stream_chunks=4,
+)
+
+_random = random.Random(int(os.getenv("AURORA_FAKE_SEED", "0")))
+_lock = threading.Lock()
+_files = {}
+calls = {"generate_content": 0, "send_message": 0, "upload_file": 0, "get_file": 0}
+
+
+class ResourceExhausted(Exception):
+    code = 429
+
+
+class InternalServerError(Exception):
+    code = 500
+
+
+def configure(api_key=None, **kwargs):
+    settings.api_key = api_key
+
+
+types = SimpleNamespace(GenerationConfig=lambda **kwargs: dict(kwargs))
+
+
+def _count(name):
+    with _lock:
+        calls[name] += 1
+
+
+# Sleep for the configured latency and raise injected errors
+def _simulate_call():
+    with _lock:
+        delay = max(0.0, settings.latency + _random.uniform(-settings.jitter, settings.jitter))
+        roll = _random.random()
+    time.sleep(delay)
+    if roll < settings.rate_limit_rate:
+        raise ResourceExhausted("429 Resource has been exhausted (fake quota).")
+    if roll < settings.rate_limit_rate + settings.error_rate:
+        raise InternalServerError("500 Internal error (fake).")
+
+
+# Canned answers shaped like what each page expects
+def _answer(prompt):
+    text = " ".join(str(p) for p in prompt) if isinstance(prompt, (list, tuple)) else str(prompt)
+    if "Write a python code to plot" in text:
+        return ("```python\nimport pandas as pd\nimport matplotlib.pyplot as plt\n"
+                "df = pd.read_csv()\ndf.select_dtypes('number').iloc[:, :2].plot()\n"
+                "plt.title('Fake plot')\nplt.xticks(rotation=90)\nplt.tight_layout()\n```")
+    if "QUERY PLAN" in text:
+        # Row count and mean of the first numeric column of the schema
+        numeric = re.search(r"^- (.+?): (?:int|float)", text, re.MULTILINE)
+        if numeric is None:
+            return json.dumps({"answerable": False})
+        return json.dumps({"answerable": True, "aggregations": [
+            {"column": "*", "func": "count", "as": "rows"},
+            {"column": numeric.group(1), "func": "mean", "as": f"mean_{numeric.group(1)}"}]})
+    return (f"- This is a fake Gemini response ({len(text)} characters of prompt).\n"
+            "- 1. Generated locally by fake_genai for testing.\n"
+            "- 2. Recommendation generated by AI, please verify before acting on it.")
+
+
+class GenerateContentResponse:
+    def __init__(self, text, stream=False):
+        self._text = text
+        self._stream = stream
+        self._resolved = not stream
+
+    def __iter__(self):
+        size = max(1, len(self._text) // settings.stream_chunks)
+        for i in range(0, len(self._text), size):
+            yield SimpleNamespace(text=self._text[i:i + size])
+        self._resolved = True
+
+    def resolve(self):
+        for _ in self:
+            pass
+
+    @property
+    def text(self):
+        if not self._resolved:
+            raise ValueError("Please let the response complete iteration before accessing the final accumulated attributes (or call `response.resolve()`)")
+        return self._text
+
+
+class ChatSession:
+    def __init__(self, model, history=None):
+        self.model = model
+        self.history = list(history or [])
+
+    def send_message(self, content, stream=False, **kwargs):
+        _count("send_message")
+        _simulate_call()
+        response = GenerateContentResponse(_answer(content), stream=stream)
+        self.history.append({"role": "user", "parts": [content]})
+        self.history.append({"role": "model", "parts": [response._text]})
+        return response
+
+
+class GenerativeModel:
+    def __init__(self, model_name="gemini-1.5-flash", generation_config=None, **kwargs):
+        self.model_name = model_name
+        self.generation_config = generation_config
+
+    def generate_content(self, contents, generation_config=None, stream=False, **kwargs):
+        _count("generate_content")
+        _simulate_call()
+        return GenerateContentResponse(_answer(contents), stream=stream)
+
+    def start_chat(self, history=None, **kwargs):
+        return ChatSession(self, history)
+
+
+class _File:
+    def __init__(self, path, mime_type, display_name):
+        self.name = f"files/{uuid.uuid4().hex[:12]}"
+        self.display_name = display_name or os.path.basename(path)
+        self.uri = f"https://fake.generativelanguage.local/v1beta/{self.name}"
+        self.mime_type = mime_type
+        self.size_bytes = os.path.getsize(path)
+        self.created = time.monotonic()
+        with _lock:
+            self.fails = _random.random() < settings.failed_upload_rate
+
+    @property
+    def state(self):
+        if time.monotonic() - self.created < settings.processing_seconds:
+            return SimpleNamespace(name="PROCESSING")
+        return SimpleNamespace(name="FAILED" if self.fails else "ACTIVE")
+
+
+def upload_file(path, mime_type=None, display_name=None, **kwargs):
+    _count("upload_file")
+    _simulate_call()
+    file = _File(path, mime_type, display_name)
+    with _lock:
+        _files[file.name] = file
+    return file
+
+
+def get_file(name):
+    _count("get_file")
+    with _lock:
+        return _files[name]
@@ -0,0 +1,286 @@
+import time
+import random
+import hashlib
+import itertools
+import threading
+import heapq
+from concurrent.futures import Future
+
+# Priorities for the scheduler queue (lower number is served first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# Prometheus name, type and help text of each stats() entry
+STAT_METRICS = {
+    "queue_depth": ("gemini_queue_depth", "gauge", "Gemini requests waiting in the queue."),
+    "active": ("gemini_active", "gauge", "Gemini requests running now."),
+    "submitted": ("gemini_submitted_total", "counter", "Gemini requests submitted (coalesced ones excluded)."),
+    "completed": ("gemini_completed_total", "counter", "Gemini requests that returned a response."),
+    "failed": ("gemini_failed_total", "counter", "Gemini requests that raised an error after any retries."),
+    "coalesced": ("gemini_coalesced_total", "counter", "Requests answered by an identical request already in flight."),
+    "retries": ("gemini_retries_total", "counter", "Requests re-queued after a rate limit (429) response."),
+    "avg_wait_s": ("gemini_avg_wait_seconds", "gauge", "Mean queue wait of the last 1000 requests."),
+    "p95_wait_s": ("gemini_p95_wait_seconds", "gauge", "95th percentile queue wait of the last 1000 requests."),
+}
+
+
+# Token bucket that hands out reservations, so callers know how long to wait
+class TokenBucket:
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1, rate_per_minute)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now=None):
+        # Take one token and return the number of seconds to wait before using it
+        with self.lock:
+            now = time.monotonic() if now is None else now
+            self._refill(now)
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def wait_time(self, now=None):
+        # Seconds until a token is available, without taking it
+        with self.lock:
+            now = time.monotonic() if now is None else now
+            self._refill(now)
+            return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        with self.lock:
+            self.tokens -= 1
+
+
+# Check whether an exception is a Gemini quota error (HTTP 429)
+def is_rate_limit_error(exc):
+    code = getattr(exc, "code", None)
+    if code == 429:
+        return True
+    if type(exc).__name__ in ("ResourceExhausted", "TooManyRequests"):
+        return True
+    # Only a leading HTTP status, so messages that merely contain the digits do not match
+    return str(exc).startswith("429 ")
+
+
+# Build a stable key for coalescing identical requests
+def make_coalesce_key(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class _Request:
+    def __init__(self, fn, args, kwargs, key, priority, coalesce_key):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.priority = priority
+        self.coalesce_key = coalesce_key
+        self.future = Future()
+        self.enqueued = time.monotonic()
+        self.not_before = 0.0
+        self.attempts = 0
+
+
+class GeminiScheduler:
+    """Shared queue that every Gemini call goes through.
+
+    Requests are rate limited per API key and globally with token buckets,
+    run on a bounded pool of worker threads in priority order, retried with
+    exponential backoff on 429 errors, and identical in-flight requests
+    (same ``coalesce_key``) share a single upstream call. Workers only pick
+    requests that can start now: a throttled key or a request in backoff
+    stays queued without holding a worker, so other keys and higher
+    priorities go ahead of it.
+    """
+
+    def __init__(self, per_key_rpm=15, global_rpm=60, max_concurrency=4,
+                 max_retries=4, backoff_base=2.0, backoff_max=60.0):
+        self.per_key_rpm = per_key_rpm
+        self.global_bucket = TokenBucket(global_rpm)
+        self.key_buckets = {}
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # Pending requests as a heap of (priority, sequence, request); guarded by `ready`
+        self.pending = []
+        self.counter = itertools.count()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.ready = threading.Condition()
+        self.stopping = False
+        self.workers = []
+        self.active = 0
+
+        # Counters exposed through stats()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.wait_times = []
+
+    # Fingerprint the API key so the raw key is never kept as a dict key
+    def _bucket_for(self, key):
+        fingerprint = hashlib.sha256(str(key).encode("utf-8")).hexdigest()[:16]
+        with self.lock:
+            bucket = self.key_buckets.get(fingerprint)
+            if bucket is None:
+                bucket = TokenBucket(self.per_key_rpm)
+                self.key_buckets[fingerprint] = bucket
+            return bucket
+
+    def _start_workers(self):
+        with self.lock:
+            while len(self.workers) < self.max_concurrency:
+                worker = threading.Thread(target=self._worker, name=f"gemini-worker-{len(self.workers)}", daemon=True)
+                worker.start()
+                self.workers.append(worker)
+
+    def submit(self, fn, *args, key=None, priority=PRIORITY_INTERACTIVE, coalesce_key=None, **kwargs):
+        # Returns a Future; identical in-flight requests get the same Future back
+        with self.lock:
+            if coalesce_key is not None and coalesce_key in self.in_flight:
+                self.coalesced += 1
+                return self.in_flight[coalesce_key].future
+            request = _Request(fn, args, kwargs, key, priority, coalesce_key)
+            if coalesce_key is not None:
+                self.in_flight[coalesce_key] = request
+            self.submitted += 1
+        self._enqueue(request)
+        self._start_workers()
+        return request.future
+
+    def call(self, fn, *args, key=None, priority=PRIORITY_INTERACTIVE, coalesce_key=None, timeout=None, **kwargs):
+        # Blocking helper used by the Streamlit pages
+        future = self.submit(fn, *args, key=key, priority=priority, coalesce_key=coalesce_key, **kwargs)
+        return future.result(timeout=timeout)
+
+    def _enqueue(self, request):
+        with self.ready:
+            heapq.heappush(self.pending, (request.priority, next(self.counter), request))
+            self.ready.notify()
+
+    # Pop the highest-priority request that can start now and take its tokens.
+    # Returns (request, 0) or (None, seconds until something may become ready).
+    def _next_ready(self):
+        now = time.monotonic()
+        wait = None
+        global_wait = self.global_bucket.wait_time(now)
+        for entry in sorted(self.pending):
+            request = entry[2]
+            delay = request.not_before - now
+            if delay <= 0:
+                bucket = self._bucket_for(request.key)
+                # The global token is only taken once the key itself is ready
+                delay = bucket.wait_time(now) or global_wait
+                if delay <= 0:
+                    bucket.take()
+                    self.global_bucket.take()
+                    self.pending.remove(entry)
+                    heapq.heapify(self.pending)
+                    return request, 0.0
+            wait = delay if wait is None else min(wait, delay)
+        return None, wait
+
+    def _worker(self):
+        while True:
+            with self.ready:
+                while True:
+                    # Drain what is already queued before stopping
+                    if self.stopping and not self.pending:
+                        return
+                    request, wait = self._next_ready()
+                    if request is not None:
+                        break
+                    self.ready.wait(timeout=wait)
+            with self.lock:
+                self.active += 1
+            try:
+                self._run(request)
+            finally:
+                with self.lock:
+                    self.active -= 1
+
+    def _run(self, request):
+        if request.attempts == 0:
+            with self.lock:
+                self.wait_times.append(time.monotonic() - request.enqueued)
+                del self.wait_times[:-1000]
+        request.attempts += 1
+        try:
+            result = request.fn(*request.args, **request.kwargs)
+        except Exception as exc:
+            if is_rate_limit_error(exc) and request.attempts <= self.max_retries:
+                with self.lock:
+                    self.retries += 1
+                # Back off in the queue instead of sleeping on a worker
+                backoff = min(self.backoff_max, self.backoff_base * 2 ** (request.attempts - 1))
+                request.not_before = time.monotonic() + backoff + random.uniform(0, backoff / 2)
+                self._enqueue(request)
+                return
+            self._finish(request, exc=exc)
+            return
+        self._finish(request, result=result)
+
+    def _finish(self, request, result=None, exc=None):
+        with self.lock:
+            if request.coalesce_key is not None:
+                self.in_flight.pop(request.coalesce_key, None)
+            if exc is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+        if exc is None:
+            request.future.set_result(result)
+        else:
+            request.future.set_exception(exc)
+
+    def stats(self):
+        with self.lock:
+            waits = sorted(self.wait_times)
+            return {
+                "queue_depth": len(self.pending),
+                "active": self.active,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "coalesced": self.coalesced,
+                "retries": self.retries,
+                "avg_wait_s": sum(waits) / len(waits) if waits else 0.0,
+                "p95_wait_s": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            }
+
+    # stats() as (name, type, help, value) rows for tracing.registry.add_collector
+    def metrics(self):
+        stats = self.stats()
+        return [(name, kind, help_text, stats[key]) for key, (name, kind, help_text) in STAT_METRICS.items()]
+
+    # Stop the workers once the queue is drained; cancel_pending drops queued requests instead
+    def shutdown(self, cancel_pending=False):
+        with self.ready:
+            if cancel_pending:
+                for _, _, request in self.pending:
+                    request.future.cancel()
+                    with self.lock:
+                        if request.coalesce_key is not None:
+                            self.in_flight.pop(request.coalesce_key, None)
+                self.pending.clear()
+            self.stopping = True
+            self.ready.notify_all()
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
@@ -0,0 +1,70 @@
+import math
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import columnar_store
+
+# Server-side paginated preview over the memory-mapped Arrow copy of a dataset.
+# Only the requested window is converted to pandas and sent to the browser.
+# Without sort or filter a page is a zero-copy slice; sorting is a partial
+# sort of the first (page * page_size) rows and filtering is a vectorized
+# Arrow scan, so nothing ever serializes the whole dataset.
+
+MAX_PAGE_SIZE = 500
+MAX_COLUMNS = 50
+PAGE_SIZES = (25, 50, 100, 250, 500)
+ROW_NUMBER = "__aurora_row_number"
+
+
+# Filter: case-insensitive substring match on the column's text form
+def _filtered(table, filter_column, filter_text):
+    if filter_column and filter_text:
+        text = pc.cast(table[filter_column], pa.string())
+        mask = pc.fill_null(pc.match_substring(text, filter_text, ignore_case=True), False)
+        table = table.filter(mask)
+    return table
+
+
+# Number of pages for a page size and filter (only the filter column is scanned)
+def page_count(path, page_size=100, filter_column=None, filter_text=None):
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    if filter_column and filter_text:
+        rows = _filtered(columnar_store.read_table(path, [filter_column]), filter_column, filter_text).num_rows
+    else:
+        rows = columnar_store.num_rows(path)
+    return max(1, math.ceil(rows / page_size))
+
+
+def preview_window(path, page=1, page_size=100, columns=None, sort_by=None, ascending=True,
+                   filter_column=None, filter_text=None):
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    table = columnar_store.read_table(path)
+    columns = list(columns or table.column_names)[:MAX_COLUMNS]
+
+    table = _filtered(table, filter_column, filter_text)
+
+    total_rows = table.num_rows
+    total_pages = max(1, math.ceil(total_rows / page_size))
+    page = max(1, min(int(page), total_pages))
+    offset = (page - 1) * page_size
+
+    if sort_by and total_rows:
+        order = "ascending" if ascending else "descending"
+        needed = min(total_rows, offset + page_size)
+        # The row number breaks ties, so the order is total and consecutive pages never overlap or skip rows
+        keys = table.select([sort_by]).append_column(ROW_NUMBER, pa.array(range(total_rows), pa.int64()))
+        sort_keys = [(sort_by, order), (ROW_NUMBER, "ascending")]
+        top_keys = keys.take(pc.select_k_unstable(keys, k=needed, sort_keys=sort_keys))
+        top_keys = top_keys.take(pc.sort_indices(top_keys, sort_keys=sort_keys))
+        window = table.take(top_keys[ROW_NUMBER].slice(offset, page_size))
+    else:
+        window = table.slice(offset, page_size)
+
+    return {
+        "data": window.select(columns).to_pandas(),
+        "page": page,
+        "total_pages": total_pages,
+        "total_rows": total_rows,
+        "first_row": offset + 1 if total_rows else 0,
+        "last_row": min(offset + page_size, total_rows),
+    }
@@ -0,0 +1,308 @@
+import re
+import json
+import numpy as np
+import pandas as pd
+
+import timeseries
+import columnar_store
+
+# Local query execution for SmartQuery. The model only sees the schema and
+# answers with a small JSON plan (filter / group by / aggregate / sort / limit).
+# The plan is validated against a fixed vocabulary and run vectorized with
+# pandas on just the columns the plan reads; only the (small) result goes back
+# to the model for phrasing. Prompt size no longer grows with the number of rows.
+
+FILTER_OPS = ("==", "!=", ">", ">=", "<", "<=", "in", "not_in", "between", "contains", "isnull", "notnull")
+AGGREGATIONS = ("count", "sum", "mean", "median", "min", "max", "std", "nunique", "first", "last")
+DATETIME_PARTS = ("year", "quarter", "month", "day", "day_of_week", "hour", "date")
+MAX_LIMIT = 1000
+MAX_RESULT_ROWS = 50
+
+PLAN_PROMPT = """You translate questions about a table into a QUERY PLAN in JSON. You cannot see the data, only its schema.
+Schema of the table {name} ({rows} rows):
+{schema}
+
+Return only a JSON object with these keys:
+- "answerable": false if the question cannot be answered by filtering, grouping and aggregating this table (then leave the rest empty)
+- "filters": list of {{"column": str, "op": one of {ops}, "value": ..., "part": optional one of {parts} (for datetime columns)}}
+- "group_by": list of column names or {{"column": str, "part": one of {parts}}}
+- "aggregations": list of {{"column": str or "*", "func": one of {aggs}, "as": output name}}
+- "columns": list of columns to return when there are no aggregations
+- "sort": list of {{"column": output column, "ascending": bool}}
+- "limit": integer (at most {max_limit})
+Month, quarter and day_of_week parts are numbers (January = 1, Monday = 0). Dates are ISO strings.
+
+Question: {question}"""
+
+
+class PlanError(ValueError):
+    pass
+
+
+# Parse the datetime column so date filters and parts work
+def prepare_frame(df):
+    column = timeseries.detect_datetime_column(df)
+    if column is not None and not pd.api.types.is_datetime64_any_dtype(df[column]):
+        df = df.copy()
+        df[column] = pd.to_datetime(df[column], errors="coerce", format="mixed")
+    return df
+
+
+# Compact schema: dtype plus range or a few distinct values per column
+def schema_description(df, max_values=5):
+    lines = []
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            detail = f"datetime from {series.min()} to {series.max()}"
+        elif pd.api.types.is_numeric_dtype(series):
+            detail = f"{series.dtype} from {series.min()} to {series.max()}"
+        else:
+            values = series.dropna().astype(str).value_counts().head(max_values).index.tolist()
+            detail = f"text, {series.nunique()} distinct, e.g. {values}"
+        nulls = int(series.isna().sum())
+        lines.append(f"- {column}: {detail}" + (f", {nulls} missing" if nulls else ""))
+    return "\n".join(lines)
+
+
+def build_plan_prompt(schema, rows, question, name="dataset"):
+    return PLAN_PROMPT.format(name=name, rows=rows, schema=schema, question=question,
+                              ops=list(FILTER_OPS), parts=list(DATETIME_PARTS), aggs=list(AGGREGATIONS), max_limit=MAX_LIMIT)
+
+
+# Pull the JSON object out of the model's answer (code fences and chatter are ignored)
+def parse_plan(text):
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not match:
+        raise PlanError("The model did not return a query plan.")
+    try:
+        plan = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        raise PlanError(f"The query plan is not valid JSON: {e}") from e
+    if not isinstance(plan, dict):
+        raise PlanError("The query plan must be a JSON object.")
+    return plan
+
+
+def _column_spec(spec):
+    if isinstance(spec, str):
+        return spec, None
+    if isinstance(spec, dict) and isinstance(spec.get("column"), str):
+        return spec["column"], spec.get("part")
+    raise PlanError(f"Invalid column reference: {spec!r}")
+
+
+# Table columns a plan reads, so only those are loaded; None when it returns whole rows.
+# Malformed entries are skipped here and rejected by validate_plan().
+def plan_columns(plan, available):
+    available = list(map(str, available))
+    if not plan.get("aggregations") and not plan.get("columns"):
+        return None
+    referenced = set()
+    for item in plan.get("filters") or []:
+        if isinstance(item, dict):
+            referenced.add(item.get("column"))
+    for spec in plan.get("group_by") or []:
+        referenced.add(spec if isinstance(spec, str) else spec.get("column") if isinstance(spec, dict) else None)
+    for item in plan.get("aggregations") or []:
+        if isinstance(item, dict):
+            referenced.add(item.get("column"))
+    referenced.update(c for c in plan.get("columns") or [] if isinstance(c, str))
+    return [c for c in available if c in referenced]
+
+
+# Schema text for the plan prompt, read one column at a time from the columnar copy
+def table_schema(path):
+    lines = []
+    for column in columnar_store.schema(path).names:
+        lines.append(schema_description(prepare_frame(columnar_store.read_columns(path, [column]))))
+    return "\n".join(lines)
+
+
+# The parsed DataFrame a plan runs against, with only the columns it reads
+def plan_frame(path, plan):
+    columns = plan_columns(plan, columnar_store.schema(path).names)
+    return prepare_frame(columnar_store.read_columns(path, columns))
+
+
+# Check the plan against the table and the allowed vocabulary; returns a normalized copy
+def validate_plan(plan, df):
+    columns = set(map(str, df.columns))
+
+    def check_column(column, part=None):
+        if column not in columns:
+            raise PlanError(f"Unknown column: {column}")
+        if part is not None:
+            if part not in DATETIME_PARTS:
+                raise PlanError(f"Unknown datetime part: {part}")
+            if not pd.api.types.is_datetime64_any_dtype(df[column]):
+                raise PlanError(f"Column {column} is not a datetime column")
+
+    answerable = plan.get("answerable", True)
+    if not isinstance(answerable, bool):
+        raise PlanError(f"'answerable' must be true or false, got {answerable!r}")
+    normalized = {"answerable": answerable, "filters": [], "group_by": [],
+                  "aggregations": [], "columns": [], "sort": [], "limit": None}
+    if not answerable:
+        return normalized
+
+    for item in plan.get("filters") or []:
+        if not isinstance(item, dict) or item.get("op") not in FILTER_OPS:
+            raise PlanError(f"Invalid filter: {item!r}")
+        check_column(item.get("column"), item.get("part"))
+        if item["op"] == "between" and not (isinstance(item.get("value"), list) and len(item["value"]) == 2):
+            raise PlanError("'between' needs a [low, high] value")
+        if item["op"] in ("in", "not_in") and not isinstance(item.get("value"), list):
+            raise PlanError(f"'{item['op']}' needs a list value")
+        normalized["filters"].append({"column": item["column"], "op": item["op"], "value": item.get("value"), "part": item.get("part")})
+
+    for spec in plan.get("group_by") or []:
+        column, part = _column_spec(spec)
+        check_column(column, part)
+        normalized["group_by"].append({"column": column, "part": part})
+
+    outputs = set()
+    for item in plan.get("aggregations") or []:
+        if not isinstance(item, dict) or item.get("func") not in AGGREGATIONS:
+            raise PlanError(f"Invalid aggregation: {item!r}")
+        column = item.get("column", "*")
+        if column == "*":
+            if item["func"] != "count":
+                raise PlanError("Only count can be applied to '*'")
+        else:
+            check_column(column)
+            if item["func"] in ("sum", "mean", "median", "std") and not pd.api.types.is_numeric_dtype(df[column]):
+                raise PlanError(f"Cannot compute {item['func']} of non-numeric column {column}")
+        name = str(item.get("as") or f"{item['func']}_{column if column != '*' else 'rows'}")
+        outputs.add(name)
+        normalized["aggregations"].append({"column": column, "func": item["func"], "as": name})
+
+    if normalized["group_by"] and not normalized["aggregations"]:
+        raise PlanError("'group_by' needs at least one aggregation")
+
+    for column in plan.get("columns") or []:
+        check_column(column)
+        normalized["columns"].append(column)
+
+    # After aggregation only the group keys and the aggregates are left to sort by
+    group_names = {f"{g['column']}_{g['part']}" if g["part"] else g["column"] for g in normalized["group_by"]}
+    if normalized["aggregations"]:
+        sortable = outputs | group_names
+    else:
+        sortable = set(normalized["columns"]) or columns
+    for item in plan.get("sort") or []:
+        if not isinstance(item, dict) or item.get("column") not in sortable:
+            raise PlanError(f"Invalid sort: {item!r}")
+        ascending = item.get("ascending", True)
+        if not isinstance(ascending, bool):
+            raise PlanError(f"'ascending' must be true or false, got {ascending!r}")
+        normalized["sort"].append({"column": item["column"], "ascending": ascending})
+
+    limit = plan.get("limit")
+    if limit is not None:
+        if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+            raise PlanError(f"Invalid limit: {limit!r}")
+        normalized["limit"] = min(limit, MAX_LIMIT)
+    return normalized
+
+
+def _datetime_part(series, part):
+    if part == "date":
+        return series.dt.date
+    if part == "day_of_week":
+        return series.dt.dayofweek
+    return getattr(series.dt, part)
+
+
+def _coerce(value, series):
+    if isinstance(value, list):
+        return [_coerce(v, series) for v in value]
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return pd.Timestamp(value)
+    if pd.api.types.is_numeric_dtype(series) and isinstance(value, str):
+        return float(value)
+    return value
+
+
+def _filter_mask(df, item):
+    series = df[item["column"]]
+    if item["part"]:
+        series = _datetime_part(series, item["part"])
+    op, value = item["op"], item["value"]
+    if op == "isnull":
+        return series.isna()
+    if op == "notnull":
+        return series.notna()
+    if op == "contains":
+        return series.astype(str).str.contains(str(value), case=False, regex=False, na=False)
+    if not item["part"]:
+        value = _coerce(value, series)
+    if op == "between":
+        low, high = value
+        # Whole-day upper bound for dates such as "2024-07-31"
+        if isinstance(high, pd.Timestamp) and high == high.normalize():
+            return (series >= low) & (series < high + pd.Timedelta(days=1))
+        return series.between(low, high)
+    if op == "in":
+        return series.isin(value)
+    if op == "not_in":
+        return ~series.isin(value)
+    return {"==": series.eq, "!=": series.ne, ">": series.gt, ">=": series.ge, "<": series.lt, "<=": series.le}[op](value)
+
+
+# Aggregate a whole column; Series.first/last are offset-based, so take the first/last row instead
+def _aggregate(series, func):
+    if func in ("first", "last"):
+        series = series.dropna()
+        if series.empty:
+            return np.nan
+        return series.iloc[0] if func == "first" else series.iloc[-1]
+    return series.agg(func)
+
+
+# Run a validated plan; returns a DataFrame
+def execute_plan(plan, df):
+    mask = np.ones(len(df), dtype=bool)
+    for item in plan["filters"]:
+        mask &= _filter_mask(df, item).to_numpy()
+    data = df[mask]
+
+    if plan["aggregations"]:
+        if plan["group_by"]:
+            keys = []
+            for group in plan["group_by"]:
+                series = data[group["column"]]
+                if group["part"]:
+                    series = _datetime_part(series, group["part"]).rename(f"{group['column']}_{group['part']}")
+                keys.append(series)
+            grouped = data.groupby(keys, dropna=False)
+            parts = {}
+            for agg in plan["aggregations"]:
+                if agg["column"] == "*":
+                    parts[agg["as"]] = grouped.size()
+                else:
+                    parts[agg["as"]] = grouped[agg["column"]].agg(agg["func"])
+            result = pd.DataFrame(parts).reset_index()
+        else:
+            row = {}
+            for agg in plan["aggregations"]:
+                row[agg["as"]] = len(data) if agg["column"] == "*" else _aggregate(data[agg["column"]], agg["func"])
+            result = pd.DataFrame([row])
+    else:
+        result = data[plan["columns"]] if plan["columns"] else data
+
+    if plan["sort"]:
+        result = result.sort_values([s["column"] for s in plan["sort"]], ascending=[s["ascending"] for s in plan["sort"]])
+    if plan["limit"]:
+        result = result.head(plan["limit"])
+    return result
+
+
+# Prompt asking the model to phrase the computed result
+def build_answer_prompt(question, plan, result, name="dataset"):
+    shown = result.head(MAX_RESULT_ROWS)
+    note = f" (first {MAX_RESULT_ROWS} of {len(result)} rows)" if len(result) > MAX_RESULT_ROWS else ""
+    return (f"The question about the dataset {name} was: {question}\n"
+            f"It was answered by running this query plan locally: {json.dumps(plan, default=str)}\n"
+            f"Result{note}:\n{shown.to_csv(index=False)}\n"
+            "Answer the question in plain language using only this result. Quote the numbers exactly.")
@@ -0,0 +1,136 @@
+import os
+import time
+import hashlib
+import tempfile
+import threading
+
+# Content-addressed scratch space for uploaded files. Blobs are named after
+# the SHA-256 of their bytes, so two users uploading "data.csv" never clash and
+# the same bytes are written only once. Writes go to a temp file that is
+# renamed into place, so readers see either nothing or the whole blob. A
+# background thread evicts blobs by age; every write also checks the quota and
+# evicts the least recently used blobs first when it would go over.
+
+SCRATCH_DIR = os.getenv("AURORA_SCRATCH_DIR", os.path.join(tempfile.gettempdir(), "aurora_scratch"))
+MAX_BYTES = int(float(os.getenv("AURORA_SCRATCH_MAX_MB", "2048")) * 1024 * 1024)
+MAX_BLOB_BYTES = int(float(os.getenv("AURORA_SCRATCH_MAX_BLOB_MB", "500")) * 1024 * 1024)
+MAX_AGE_SECONDS = float(os.getenv("AURORA_SCRATCH_MAX_AGE_HOURS", "24")) * 3600
+
+
+class QuotaExceeded(ValueError):
+    pass
+
+
+class ScratchStore:
+    def __init__(self, root=SCRATCH_DIR, max_bytes=MAX_BYTES, max_blob_bytes=MAX_BLOB_BYTES, max_age_seconds=MAX_AGE_SECONDS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_blob_bytes = max_blob_bytes
+        self.max_age_seconds = max_age_seconds
+        self.lock = threading.RLock()
+        # Bytes of writes in progress, so concurrent puts cannot overshoot the quota together
+        self.reserved = 0
+        self.evictor = None
+        os.makedirs(self.root, exist_ok=True)
+
+    # Path of a blob: <root>/blobs/<first two hex chars>/<digest><suffix>
+    def path_for(self, digest, suffix=""):
+        return os.path.join(self.root, "blobs", digest[:2], f"{digest}{suffix}")
+
+    # Store bytes once and return the shared path; the extension is kept for readers that need it
+    def put(self, data, suffix=""):
+        if len(data) > self.max_blob_bytes:
+            raise QuotaExceeded(f"File is too large ({len(data) / 1024 / 1024:.0f} MB, limit {self.max_blob_bytes / 1024 / 1024:.0f} MB).")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest, suffix)
+        try:
+            # Refresh the timestamp so eviction treats it as recently used
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            # Not stored yet, or evicted a moment ago: write it
+            pass
+        self._reserve(len(data))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    file.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        finally:
+            with self.lock:
+                self.reserved -= len(data)
+        return path
+
+    # Make room for a write of size bytes, evicting least recently used blobs if needed
+    def _reserve(self, size):
+        with self.lock:
+            needed = self.reserved + size
+            if self.usage()["bytes"] + needed > self.max_bytes:
+                self.evict(reserve=needed)
+                if self.usage()["bytes"] + needed > self.max_bytes:
+                    raise QuotaExceeded(f"Scratch space is full ({self.max_bytes / 1024 / 1024:.0f} MB), please try again later.")
+            self.reserved += size
+
+    # Store a Streamlit UploadedFile, keeping its extension
+    def put_upload(self, uploaded_file):
+        return self.put(uploaded_file.getvalue(), suffix=os.path.splitext(uploaded_file.name)[1].lower())
+
+    def _entries(self):
+        entries = []
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def usage(self):
+        entries = self._entries()
+        return {"files": len(entries), "bytes": sum(size for _, size, _ in entries), "max_bytes": self.max_bytes}
+
+    # Remove blobs older than max_age_seconds, then the least recently used until under quota.
+    # Open readers are unaffected on POSIX; the file disappears once they close it.
+    # reserve keeps that many bytes free for a write about to happen.
+    def evict(self, now=None, reserve=0):
+        now = time.time() if now is None else now
+        removed = 0
+        with self.lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for mtime, size, path in entries:
+                # Leftover temp files from interrupted writes count as expired after an hour
+                expired = now - mtime > (3600 if path.endswith(".tmp") else self.max_age_seconds)
+                if not expired and total + reserve <= self.max_bytes:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+        return removed
+
+    def start_eviction(self, interval=300):
+        if self.evictor is not None:
+            return self.evictor
+
+        def loop():
+            while True:
+                try:
+                    self.evict()
+                except OSError as e:
+                    print(f"Scratch store eviction failed: {e}")
+                time.sleep(interval)
+
+        self.evictor = threading.Thread(target=loop, name="aurora-scratch-eviction", daemon=True)
+        self.evictor.start()
+        return self.evictor
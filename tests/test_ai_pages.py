@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ai_pages
+import fake_genai
+from gemini_scheduler import GeminiScheduler
+from scratch_store import ScratchStore
+
+
+class Upload:
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+
+    def getvalue(self):
+        return self.data
+
+
+@pytest.fixture
+def pages(tmp_path, monkeypatch):
+    monkeypatch.setattr(fake_genai.settings, "latency", 0)
+    monkeypatch.setattr(fake_genai.settings, "jitter", 0)
+    monkeypatch.setattr(fake_genai.settings, "processing_seconds", 0)
+    scheduler = GeminiScheduler()
+    yield ai_pages.AIPages(fake_genai, fake_genai.GenerativeModel("gemini-1.5-flash"), {}, scheduler,
+                           ScratchStore(str(tmp_path / "scratch")), store_dir=str(tmp_path / "datasets"), poll_seconds=0)
+    scheduler.shutdown()
+
+
+@pytest.fixture
+def upload():
+    df = pd.DataFrame({"price": np.arange(100.0), "group": ["a", "b"] * 50})
+    return Upload("data.csv", df.to_csv(index=False).encode("utf-8"))
+
+
+def test_smartquery_answers_from_a_local_plan(pages, upload):
+    reply = pages.smartquery(upload, "What is the average price?", "key")
+    assert reply["local_error"] is None
+    assert reply["plan"]["answerable"] and len(reply["result"]) == 1
+    assert reply["answer"]
+    assert pages.scratch.usage()["files"] == 0
+
+
+def test_smartquery_without_local_plan_sends_the_dataset(pages, upload):
+    reply = pages.smartquery(upload, "What is the average price?", "key", local=False)
+    assert reply["plan"] is None and reply["answer"]
+    assert pages.scratch.usage()["files"] == 1
+
+
+def test_autoviz_fills_in_the_stored_file(pages, upload, monkeypatch):
+    response = type("Response", (), {"text": "```python\ndf = pd.read_csv()\n```"})()
+    monkeypatch.setattr(pages.model, "generate_content", lambda *args, **kwargs: response)
+    code = pages.autoviz_code(upload, "Line Chart", "price", "key")
+    assert code == f'df = pd.read_csv(r"{pages.scratch.put_upload(upload)}")'
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import correlation
+
+
+def _frame_with_gaps(n=2000, missing=0.3, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=n)
+    df = pd.DataFrame({"a": x, "b": x + 0.1 * rng.normal(size=n), "c": rng.normal(size=n), "d": -x + rng.normal(size=n)})
+    for column in df:
+        df.loc[rng.random(n) < missing, column] = np.nan
+    return df
+
+
+def _max_error(pairs, reference):
+    return max(abs(row.correlation - reference.loc[row.column_1, row.column_2]) for row in pairs.itertuples())
+
+
+@pytest.mark.parametrize("block_size", [2, 256])
+def test_pearson_matches_pandas_with_missing_values(block_size):
+    df = _frame_with_gaps()
+    pairs = correlation.top_correlations(df, k=10, block_size=block_size, max_workers=1)
+    assert len(pairs) == 6
+    assert _max_error(pairs, df.corr()) < 1e-5
+
+
+def test_spearman_and_kendall_close_to_pandas_with_missing_values():
+    df = _frame_with_gaps()
+    assert _max_error(correlation.top_correlations(df, method="spearman", k=10), df.corr(method="spearman")) < 0.01
+    assert _max_error(correlation.top_correlations(df, method="kendall", k=10), df.corr(method="kendall")) < 1e-9
+
+
+def test_matches_pandas_without_missing_values():
+    df = _frame_with_gaps(missing=0)
+    assert _max_error(correlation.top_correlations(df, k=10), df.corr()) < 1e-5
+
+
+def test_matrix_and_pairs_use_the_same_sample():
+    df = _frame_with_gaps(n=correlation.DEFAULT_SAMPLE_ROWS + 5000)
+    pairs = correlation.top_correlations(df, k=10)
+    assert _max_error(pairs, correlation.correlation_matrix(df)) < 1e-5
+
+
+def test_wide_tables_are_sampled_to_the_cell_budget():
+    df = pd.DataFrame(np.zeros((correlation.MIN_SAMPLE_ROWS * 2, 5000), dtype=np.float32))
+    sample = correlation.sample_rows_for(df)
+    assert len(sample) == max(correlation.MIN_SAMPLE_ROWS, correlation.MAX_SAMPLE_CELLS // 5000)
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import tracing
+from gemini_scheduler import GeminiScheduler, PRIORITY_BATCH, PRIORITY_INTERACTIVE, is_rate_limit_error
+
+
+class ResourceExhausted(Exception):
+    code = 429
+
+
+def test_is_rate_limit_error():
+    assert is_rate_limit_error(ResourceExhausted("quota"))
+    assert is_rate_limit_error(Exception("429 Resource has been exhausted"))
+    assert not is_rate_limit_error(ValueError("Invalid row 1429 in file"))
+
+
+def test_throttled_key_does_not_block_other_keys():
+    # Key "a" can start two requests now and the other two wait ~30 s
+    scheduler = GeminiScheduler(per_key_rpm=2, global_rpm=600, max_concurrency=2)
+    futures = [scheduler.submit(lambda: None, key="a", priority=PRIORITY_BATCH) for _ in range(4)]
+    start = time.monotonic()
+    assert scheduler.call(lambda: "b", key="b", priority=PRIORITY_INTERACTIVE, timeout=5) == "b"
+    assert time.monotonic() - start < 1
+    assert scheduler.stats()["queue_depth"] == 2
+    scheduler.shutdown(cancel_pending=True)
+    assert sum(future.cancelled() for future in futures) == 2
+    assert all(future.done() for future in futures)
+
+
+def test_rate_limit_errors_are_retried_in_the_queue():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ResourceExhausted("429 Resource has been exhausted")
+        return "ok"
+
+    scheduler = GeminiScheduler(backoff_base=0.05)
+    assert scheduler.call(flaky, key="a", timeout=5) == "ok"
+    assert scheduler.stats()["retries"] == 2
+    scheduler.shutdown()
+
+
+def test_other_errors_are_not_retried():
+    scheduler = GeminiScheduler(backoff_base=0.05)
+    future = scheduler.submit(lambda: (_ for _ in ()).throw(ValueError("Invalid row 1429")), key="a")
+    assert isinstance(future.exception(timeout=5), ValueError)
+    assert scheduler.stats()["retries"] == 0
+    scheduler.shutdown()
+
+
+def test_identical_requests_are_coalesced():
+    calls = []
+    release = threading.Event()
+
+    def upstream():
+        calls.append(1)
+        release.wait(5)
+        return "answer"
+
+    scheduler = GeminiScheduler()
+    first = scheduler.submit(upstream, key="a", coalesce_key="same")
+    second = scheduler.submit(upstream, key="b", coalesce_key="same")
+    release.set()
+    assert first is second
+    assert first.result(timeout=5) == "answer"
+    assert len(calls) == 1
+    assert scheduler.stats()["coalesced"] == 1
+    scheduler.shutdown()
+
+
+def test_interactive_requests_run_before_queued_batch_requests():
+    order = []
+    busy = threading.Event()
+    release = threading.Event()
+
+    def block():
+        busy.set()
+        release.wait(5)
+
+    scheduler = GeminiScheduler(max_concurrency=1, global_rpm=6000, per_key_rpm=6000)
+    scheduler.submit(block, key="a")
+    assert busy.wait(5)
+    batch = [scheduler.submit(order.append, f"batch-{i}", key="a", priority=PRIORITY_BATCH) for i in range(3)]
+    interactive = scheduler.submit(order.append, "interactive", key="a", priority=PRIORITY_INTERACTIVE)
+    release.set()
+    for future in batch + [interactive]:
+        future.result(timeout=5)
+    assert order == ["interactive", "batch-0", "batch-1", "batch-2"]
+    scheduler.shutdown()
+
+
+def test_prometheus_export_types_counters_and_gauges():
+    scheduler = GeminiScheduler()
+    scheduler.call(lambda: "ok", key="a", timeout=5)
+    scheduler.shutdown()
+    registry = tracing.MetricsRegistry()
+    registry.add_collector(scheduler.metrics)
+    text = registry.to_prometheus()
+    assert "# HELP aurora_gemini_completed_total " in text
+    assert "# TYPE aurora_gemini_completed_total counter\naurora_gemini_completed_total 1\n" in text
+    assert "# TYPE aurora_gemini_queue_depth gauge\n" in text
+    assert "# TYPE aurora_gemini_p95_wait_seconds gauge\n" in text
+    assert "aurora_gemini_completed " not in text
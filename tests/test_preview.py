@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import columnar_store
+import preview
+
+
+@pytest.fixture
+def path(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"id": np.arange(20_000), "group": rng.integers(0, 3, 20_000), "text": ["a", "b"] * 10_000})
+    return columnar_store.ingest("data.csv", df.to_csv(index=False).encode("utf-8"), store_dir=str(tmp_path))
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+def test_sorted_pages_cover_every_row_once(path, ascending):
+    ids, groups = [], []
+    window = preview.preview_window(path, page=1, page_size=500, sort_by="group", ascending=ascending)
+    for page in range(1, window["total_pages"] + 1):
+        data = preview.preview_window(path, page=page, page_size=500, sort_by="group", ascending=ascending)["data"]
+        ids.extend(data["id"])
+        groups.extend(data["group"])
+    assert sorted(ids) == list(range(20_000))
+    assert groups == sorted(groups, reverse=not ascending)
+
+
+def test_filtered_window(path):
+    window = preview.preview_window(path, page=2, page_size=100, filter_column="text", filter_text="B")
+    assert window["total_rows"] == 10_000
+    assert window["first_row"] == 101
+    assert set(window["data"]["text"]) == {"b"}
+
+
+def test_page_count(path):
+    assert preview.page_count(path, page_size=500) == 40
+    assert preview.page_count(path, page_size=100, filter_column="text", filter_text="a") == 100
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import query_plan
+from query_plan import PlanError
+
+
+@pytest.fixture
+def df():
+    return query_plan.prepare_frame(pd.DataFrame({
+        "date": ["2024-06-28", "2024-07-01", "2024-07-02", "2024-07-31", "2024-08-01"],
+        "ticker": ["IBM", "IBM", "AAPL", "AAPL", "IBM"],
+        "close": [10.0, 20.0, 30.0, np.nan, 50.0],
+    }))
+
+
+def run(plan, df):
+    return query_plan.execute_plan(query_plan.validate_plan(plan, df), df)
+
+
+@pytest.mark.parametrize("plan", [
+    {"answerable": "false"},
+    {"answerable": "true"},
+    {"answerable": 0},
+    {"filters": [{"column": "missing", "op": "==", "value": 1}]},
+    {"filters": [{"column": "close", "op": "__import__", "value": "os"}]},
+    {"filters": [{"column": "close", "op": "between", "value": 1}]},
+    {"filters": [{"column": "ticker", "op": "in", "value": "IBM"}]},
+    {"filters": [{"column": "close", "op": "==", "value": 7, "part": "month"}]},
+    {"filters": [{"column": "date", "op": "==", "value": 7, "part": "weekday_name"}]},
+    {"aggregations": [{"column": "close", "func": "eval"}]},
+    {"aggregations": [{"column": "close", "func": "mean"}], "group_by": [{"column": "ticker", "part": "month"}]},
+    {"aggregations": [{"column": "*", "func": "sum"}]},
+    {"aggregations": [{"column": "ticker", "func": "mean"}]},
+    {"group_by": ["ticker"]},
+    {"aggregations": [{"column": "close", "func": "mean", "as": "avg"}], "sort": [{"column": "close"}]},
+    {"aggregations": [{"column": "close", "func": "mean", "as": "avg"}], "sort": [{"column": "avg", "ascending": "false"}]},
+    {"columns": ["ticker"], "sort": [{"column": "close"}]},
+    {"limit": 0},
+    {"limit": "10"},
+    {"limit": True},
+])
+def test_rejected_plans(plan, df):
+    with pytest.raises(PlanError):
+        query_plan.validate_plan(plan, df)
+
+
+def test_unanswerable_plan_is_not_executed(df):
+    assert query_plan.validate_plan({"answerable": False, "columns": ["close"]}, df)["answerable"] is False
+
+
+def test_parse_plan_ignores_code_fences():
+    assert query_plan.parse_plan('```json\n{"answerable": false}\n```') == {"answerable": False}
+    with pytest.raises(PlanError):
+        query_plan.parse_plan("no plan here")
+
+
+def test_month_filter_and_mean(df):
+    result = run({"filters": [{"column": "date", "op": "==", "value": 7, "part": "month"}],
+                  "aggregations": [{"column": "close", "func": "mean", "as": "avg"}]}, df)
+    assert result["avg"].tolist() == [25.0]
+
+
+def test_between_dates_includes_the_whole_last_day(df):
+    result = run({"filters": [{"column": "date", "op": "between", "value": ["2024-07-01", "2024-07-31"]}],
+                  "aggregations": [{"column": "*", "func": "count", "as": "rows"}]}, df)
+    assert result["rows"].tolist() == [3]
+
+
+def test_first_and_last_without_group_by(df):
+    result = run({"aggregations": [{"column": "close", "func": "first", "as": "first"},
+                                   {"column": "close", "func": "last", "as": "last"}]}, df)
+    assert result.iloc[0].tolist() == [10.0, 50.0]
+
+
+def test_group_by_sort_and_limit(df):
+    result = run({"group_by": ["ticker"], "aggregations": [{"column": "close", "func": "max", "as": "high"}],
+                  "sort": [{"column": "high", "ascending": False}], "limit": 1}, df)
+    assert result.to_dict("records") == [{"ticker": "IBM", "high": 50.0}]
+
+
+def test_group_by_datetime_part(df):
+    result = run({"group_by": [{"column": "date", "part": "month"}],
+                  "aggregations": [{"column": "*", "func": "count", "as": "rows"}],
+                  "sort": [{"column": "date_month", "ascending": True}]}, df)
+    assert result.to_dict("records") == [{"date_month": 6, "rows": 1}, {"date_month": 7, "rows": 3}, {"date_month": 8, "rows": 1}]
+
+
+def test_row_selection_with_filters(df):
+    result = run({"filters": [{"column": "ticker", "op": "contains", "value": "ib"}, {"column": "close", "op": ">", "value": "15"}],
+                  "columns": ["date", "close"], "sort": [{"column": "close", "ascending": False}]}, df)
+    assert result["close"].tolist() == [50.0, 20.0]
+
+
+def test_plan_frame_reads_only_the_plan_columns(tmp_path):
+    import columnar_store
+    data = b"date,ticker,close,volume\n2024-07-01,IBM,1.5,10\n2024-07-02,IBM,2.5,20\n"
+    path = columnar_store.ingest("prices.csv", data, store_dir=str(tmp_path))
+    plan = {"filters": [{"column": "date", "op": "==", "value": 7, "part": "month"}],
+            "aggregations": [{"column": "close", "func": "mean", "as": "avg"}]}
+    df = query_plan.plan_frame(path, plan)
+    assert list(df.columns) == ["date", "close"]
+    assert query_plan.execute_plan(query_plan.validate_plan(plan, df), df)["avg"].tolist() == [2.0]
+    assert query_plan.plan_columns({"filters": [{"column": "close", "op": ">", "value": 1}]}, df.columns) is None
+    assert "- close: float64 from 1.5 to 2.5" in query_plan.table_schema(path)
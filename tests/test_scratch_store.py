@@ -0,0 +1,28 @@
+import os
+import time
+import pytest
+from scratch_store import ScratchStore, QuotaExceeded
+
+
+def test_put_evicts_least_recently_used_to_stay_under_quota(tmp_path):
+    store = ScratchStore(str(tmp_path), max_bytes=250, max_blob_bytes=100)
+    paths = [store.put(bytes([i]) * 100) for i in range(2)]
+    os.utime(paths[0], (time.time() - 60, time.time() - 60))
+    newest = store.put(b"x" * 100)
+    assert not os.path.exists(paths[0])
+    assert os.path.exists(paths[1]) and os.path.exists(newest)
+    assert store.usage()["bytes"] <= 250
+
+
+def test_put_raises_when_the_write_cannot_fit(tmp_path):
+    store = ScratchStore(str(tmp_path), max_bytes=250, max_blob_bytes=100)
+    store.reserved = 200  # two writes still in progress
+    with pytest.raises(QuotaExceeded):
+        store.put(b"x" * 100)
+    assert store.reserved == 200
+
+
+def test_put_of_an_existing_blob_needs_no_space(tmp_path):
+    store = ScratchStore(str(tmp_path), max_bytes=100, max_blob_bytes=100)
+    path = store.put(b"x" * 100)
+    assert store.put(b"x" * 100) == path
@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+
+# Vectorized time-series helpers for datasets with a date/time column, such as
+# daily_adjusted_IBM.csv. Pages use summarize() to work from a few compact
+# aggregates (resampled OHLCV, returns, volatility, drawdowns) instead of the
+# raw rows.
+
+DATETIME_NAME_HINTS = ("date", "time", "timestamp", "day", "month", "period")
+PRICE_COLUMNS = ("adjusted_close", "adj_close", "close", "price", "value")
+
+# Resample rules from finest to coarsest, with their approximate length in days
+RESAMPLE_RULES = (("D", 1), ("W", 7), ("ME", 30.44), ("QE", 91.31), ("YE", 365.25))
+
+
+# Find the column that looks like a datetime. Only a sample is parsed, so this is cheap on long files.
+def detect_datetime_column(df, sample_size=200, min_ratio=0.95):
+    candidates = []
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return column
+        if series.dtype != object:
+            continue
+        hinted = any(hint in str(column).lower() for hint in DATETIME_NAME_HINTS)
+        candidates.append((hinted, column))
+
+    # Columns whose name hints at a date are tried first
+    for hinted, column in sorted(candidates, key=lambda c: not c[0]):
+        sample = df[column].dropna().head(sample_size)
+        if sample.empty:
+            continue
+        # Without a name hint, insist on date-like separators so codes such as "12" are not taken for dates
+        if not hinted and sample.astype(str).str.contains(r"[-/:]").mean() < min_ratio:
+            continue
+        parsed = pd.to_datetime(sample, errors="coerce", format="mixed")
+        if parsed.notna().mean() >= min_ratio:
+            return column
+    return None
+
+
+# Return a copy of the frame indexed by its datetime column, sorted ascending
+def to_time_index(df, column=None):
+    column = column or detect_datetime_column(df)
+    if column is None:
+        return None
+    ts = df.copy()
+    ts[column] = pd.to_datetime(ts[column], errors="coerce", format="mixed")
+    ts = ts.dropna(subset=[column]).set_index(column).sort_index()
+    ts = ts[~ts.index.duplicated(keep="last")]
+    return ts
+
+
+# Pick the price-like column to compute returns from
+def price_column(ts):
+    numeric = ts.select_dtypes(include=[np.number]).columns
+    lowered = {str(c).lower(): c for c in numeric}
+    for name in PRICE_COLUMNS:
+        if name in lowered:
+            return lowered[name]
+    return numeric[0] if len(numeric) else None
+
+
+# Observations per year, estimated from the index (252 for trading days, 365 for calendar days, ...)
+def periods_per_year(index):
+    if len(index) < 2:
+        return 1.0
+    span_years = (index[-1] - index[0]).total_seconds() / (365.25 * 86400)
+    if span_years <= 0:
+        return 1.0
+    return (len(index) - 1) / span_years
+
+
+# Choose the finest resample rule that keeps the result under max_rows
+def choose_rule(index, max_rows=36):
+    if len(index) < 2:
+        return "D"
+    span_days = max(1.0, (index[-1] - index[0]).total_seconds() / 86400)
+    for rule, days in RESAMPLE_RULES:
+        if span_days / days <= max_rows:
+            return rule
+    return RESAMPLE_RULES[-1][0]
+
+
+# Resample with OHLCV semantics where the columns allow it, mean otherwise
+def resample(ts, rule):
+    numeric = ts.select_dtypes(include=[np.number])
+    how = {}
+    for column in numeric.columns:
+        name = str(column).lower()
+        if name == "open":
+            how[column] = "first"
+        elif name == "high":
+            how[column] = "max"
+        elif name == "low":
+            how[column] = "min"
+        elif name in ("close", "adjusted_close", "adj_close"):
+            how[column] = "last"
+        elif name in ("volume", "dividend_amount"):
+            how[column] = "sum"
+        else:
+            how[column] = "mean"
+    return numeric.resample(rule).agg(how).dropna(how="all")
+
+
+def returns(prices):
+    return prices.pct_change().dropna()
+
+
+def log_returns(prices):
+    return np.log(prices).diff().dropna()
+
+
+def rolling_stats(prices, windows=(20, 50, 200)):
+    stats = {}
+    for window in windows:
+        if len(prices) >= window:
+            stats[f"sma_{window}"] = prices.rolling(window).mean().iloc[-1]
+    return stats
+
+
+def volatility(prices, annualize=True):
+    vol = log_returns(prices).std()
+    if annualize:
+        vol *= np.sqrt(periods_per_year(prices.index))
+    return vol
+
+
+# Drawdown series relative to the running maximum
+def drawdowns(prices):
+    return prices / prices.cummax() - 1.0
+
+
+# Compact summary of a time-indexed frame, small enough to show or send to Gemini
+def summarize(ts, max_rows=36):
+    rule = choose_rule(ts.index, max_rows=max_rows)
+    summary = {
+        "start": ts.index[0],
+        "end": ts.index[-1],
+        "rows": len(ts),
+        "periods_per_year": periods_per_year(ts.index),
+        "resample_rule": rule,
+        "resampled": resample(ts, rule),
+        "price_column": price_column(ts),
+    }
+    column = summary["price_column"]
+    if column is not None:
+        prices = ts[column].dropna()
+        prices = prices[prices > 0]
+        if len(prices) >= 2:
+            dd = drawdowns(prices)
+            ret = returns(prices)
+            summary.update({
+                "first_price": prices.iloc[0],
+                "last_price": prices.iloc[-1],
+                "total_return": prices.iloc[-1] / prices.iloc[0] - 1.0,
+                "annualized_volatility": volatility(prices),
+                "max_drawdown": dd.min(),
+                "max_drawdown_date": dd.idxmin(),
+                "best_period_return": ret.max(),
+                "worst_period_return": ret.min(),
+                "rolling": rolling_stats(prices),
+            })
+    return summary
+
+
+# Render the summary as plain text for prompts
+def summary_text(summary, name="dataset"):
+    lines = [
+        f"Time series summary of {name}: {summary['rows']} rows from {summary['start']} to {summary['end']} "
+        f"(about {summary['periods_per_year']:.0f} observations per year).",
+    ]
+    if "total_return" in summary:
+        column = summary["price_column"]
+        lines.append(
+            f"{column}: first {summary['first_price']:.4g}, last {summary['last_price']:.4g}, "
+            f"total return {summary['total_return']:.2%}, annualized volatility {summary['annualized_volatility']:.2%}, "
+            f"max drawdown {summary['max_drawdown']:.2%} on {summary['max_drawdown_date']}, "
+            f"best period {summary['best_period_return']:.2%}, worst period {summary['worst_period_return']:.2%}."
+        )
+        if summary["rolling"]:
+            rolling = ", ".join(f"{k}={v:.4g}" for k, v in summary["rolling"].items())
+            lines.append(f"Latest moving averages of {column}: {rolling}.")
+    lines.append(f"Aggregates resampled with rule '{summary['resample_rule']}':")
+    lines.append(summary["resampled"].to_csv(float_format="%.6g"))
+    return "\n".join(lines)
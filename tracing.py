@@ -0,0 +1,274 @@
+import os
+import sys
+import time
+import bisect
+import functools
+import threading
+import contextvars
+import resource
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Lightweight tracing for the hot paths (file parsing, cleaning, Gemini calls,
+# profiling, Sheets I/O). Spans are aggregated in-process per (stage, page) and
+# exported as Prometheus text. Tracing is off unless AURORA_TRACING=1; when off
+# span() hands back a shared no-op context manager and traced() is a single
+# flag check, so leaving the instrumentation in place costs next to nothing.
+
+_enabled = os.getenv("AURORA_TRACING", "0").lower() in ("1", "true", "yes")
+
+# Page and session of the current Streamlit script run (one thread per run)
+_page = contextvars.ContextVar("aurora_page", default="")
+_session = contextvars.ContextVar("aurora_session", default="")
+
+# Histogram buckets in seconds, from a cached parse up to a slow Gemini call
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SAMPLES_PER_STAGE = 2048
+RECENT_SPANS = 500
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+# Attribute the spans of the current script run to a page and session
+def set_context(page=None, session=None):
+    if page is not None:
+        _page.set(page)
+    if session is not None:
+        _session.set(session)
+
+
+# Resident set size of the process in bytes. This is process wide, so with
+# several sessions running at once the memory delta of a span is approximate.
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _StageStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.samples = deque(maxlen=SAMPLES_PER_STAGE)
+        self.last_memory_delta = 0
+
+    def observe(self, seconds, memory_delta, error):
+        self.count += 1
+        self.total += seconds
+        self.errors += int(error)
+        index = bisect.bisect_left(BUCKETS, seconds)
+        if index < len(BUCKETS):
+            self.bucket_counts[index] += 1
+        self.samples.append(seconds)
+        self.last_memory_delta = memory_delta
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.recent = deque(maxlen=RECENT_SPANS)
+        self.collectors = []
+
+    def observe(self, stage, page, session, seconds, memory_delta, error=False):
+        with self.lock:
+            stats = self.stages.get((stage, page))
+            if stats is None:
+                stats = self.stages[(stage, page)] = _StageStats()
+            stats.observe(seconds, memory_delta, error)
+            self.recent.append({
+                "stage": stage,
+                "page": page,
+                "session": session,
+                "seconds": seconds,
+                "memory_delta_bytes": memory_delta,
+                "error": error,
+                "time": time.time(),
+            })
+
+    # Extra metrics (e.g. Gemini queue depth) collected at export time; a collector
+    # returns (name, type, help, value) rows, type being "gauge" or "counter"
+    def add_collector(self, collector):
+        with self.lock:
+            self.collectors.append(collector)
+
+    # p50/p95 latency per (stage, page) over the recent samples
+    def summary(self):
+        rows = []
+        with self.lock:
+            for (stage, page), stats in sorted(self.stages.items()):
+                samples = sorted(stats.samples)
+                rows.append({
+                    "stage": stage,
+                    "page": page,
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "p50_s": _percentile(samples, 0.50),
+                    "p95_s": _percentile(samples, 0.95),
+                    "mean_s": stats.total / stats.count if stats.count else 0.0,
+                    "last_memory_delta_mb": stats.last_memory_delta / (1024 * 1024),
+                })
+        return rows
+
+    def recent_spans(self):
+        with self.lock:
+            return list(self.recent)
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP aurora_stage_duration_seconds Time spent in instrumented stages.",
+            "# TYPE aurora_stage_duration_seconds histogram",
+        ]
+        with self.lock:
+            stages = sorted(self.stages.items())
+            collectors = list(self.collectors)
+            for (stage, page), stats in stages:
+                labels = f'stage="{_escape(stage)}",page="{_escape(page)}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS, stats.bucket_counts):
+                    cumulative += count
+                    lines.append(f'aurora_stage_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'aurora_stage_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+                lines.append(f"aurora_stage_duration_seconds_sum{{{labels}}} {stats.total}")
+                lines.append(f"aurora_stage_duration_seconds_count{{{labels}}} {stats.count}")
+            lines.append("# HELP aurora_stage_errors_total Instrumented stages that raised an exception.")
+            lines.append("# TYPE aurora_stage_errors_total counter")
+            for (stage, page), stats in stages:
+                lines.append(f'aurora_stage_errors_total{{stage="{_escape(stage)}",page="{_escape(page)}"}} {stats.errors}')
+            lines.append("# HELP aurora_stage_last_memory_delta_bytes RSS change over the last span of a stage.")
+            lines.append("# TYPE aurora_stage_last_memory_delta_bytes gauge")
+            for (stage, page), stats in stages:
+                lines.append(f'aurora_stage_last_memory_delta_bytes{{stage="{_escape(stage)}",page="{_escape(page)}"}} {stats.last_memory_delta}')
+        for collector in collectors:
+            for name, kind, help_text, value in collector():
+                lines.append(f"# HELP aurora_{name} {help_text}")
+                lines.append(f"# TYPE aurora_{name} {kind}")
+                lines.append(f"aurora_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _percentile(samples, q):
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+@contextmanager
+def _span(name):
+    start_rss = _rss_bytes()
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        registry.observe(name, _page.get(), _session.get(), time.perf_counter() - start,
+                         _rss_bytes() - start_rss, error)
+
+
+# Context manager timing a block of code under the given stage name
+def span(name):
+    if not _enabled:
+        return _NOOP
+    return _span(name)
+
+
+# Decorator version of span(); the stage name defaults to the function name
+def traced(name=None):
+    def decorator(fn):
+        stage = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+###################################################### Exporters ######################################################
+# Write the metrics to a file (atomically) so a node exporter textfile collector can pick them up
+def write_metrics_file(path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        file.write(registry.to_prometheus())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.to_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Start the configured exporters: AURORA_METRICS_FILE (rewritten every
+# `interval` seconds) and/or AURORA_METRICS_PORT (serves /metrics locally)
+def start_exporters(path=None, port=None, interval=15):
+    path = path or os.getenv("AURORA_METRICS_FILE")
+    port = port or os.getenv("AURORA_METRICS_PORT")
+    started = {}
+    if path:
+        def write_loop():
+            while True:
+                try:
+                    write_metrics_file(path)
+                except OSError as e:
+                    print(f"Could not write metrics file {path}: {e}")
+                time.sleep(interval)
+        threading.Thread(target=write_loop, name="aurora-metrics-file", daemon=True).start()
+        started["file"] = path
+    if port:
+        server = ThreadingHTTPServer(("127.0.0.1", int(port)), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="aurora-metrics-http", daemon=True).start()
+        started["port"] = int(port)
+    return started